@@ -0,0 +1,208 @@
+import atexit
+import base64
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from backend.config import (
+    CAMPAIGN_STORE, CAMPAIGN_STORE_PATH, DEADLINE_MIN_PERSIST_SECONDS,
+    PERSIST_BATCH_SIZE, PERSIST_FLUSH_INTERVAL_SECONDS, PERSIST_MAX_QUEUED, PERSIST_MAX_RETRIES
+)
+from backend.deadline import has_budget
+from backend.persistence_queue import WriteBehindQueue
+from backend import firebase_service
+from metrics import span
+
+# Columns that can be filtered on in list_campaigns
+FILTER_COLUMNS = ("industry", "platform", "goal")
+
+
+def encode_cursor(created_at: float, campaign_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at!r}:{campaign_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, campaign_id = raw.split(":")
+        return float(created_at), int(campaign_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class SQLiteCampaignStore:
+    """
+    Local campaign history. Campaigns are stored as JSON next to indexed
+    columns; listing is newest first with keyset pagination on
+    (created_at, id), so every page costs the same however deep it is.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS campaigns ("
+            " id INTEGER PRIMARY KEY,"
+            " created_at REAL NOT NULL,"
+            " product TEXT,"
+            " industry TEXT,"
+            " platform TEXT,"
+            " goal TEXT,"
+            " campaign TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS campaigns_created ON campaigns (created_at, id)")
+        for column in FILTER_COLUMNS:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS campaigns_{column}_created ON campaigns ({column}, created_at, id)"
+            )
+        conn.commit()
+
+    def _connection(self):
+        # One connection per thread; WAL lets readers run alongside the writer
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def write_many(self, records):
+        """Insert records ({created_at, metadata..., campaign}) in one transaction"""
+        rows = [
+            (
+                record["created_at"],
+                record.get("product"),
+                record.get("industry"),
+                record.get("platform"),
+                record.get("goal"),
+                json.dumps(record["campaign"], default=str)
+            )
+            for record in records
+        ]
+        with self._write_lock, span("sqlite_commit"):
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO campaigns (created_at, product, industry, platform, goal, campaign)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+
+    def list_campaigns(self, limit: int = 20, cursor: str = None, include_campaign: bool = False, **filters):
+        """Newest-first page of campaigns; returns (items, next_cursor)"""
+        clauses, params = [], []
+        for column in FILTER_COLUMNS:
+            if filters.get(column) is not None:
+                clauses.append(f"{column} = ?")
+                params.append(filters[column])
+        if cursor:
+            created_at, campaign_id = decode_cursor(cursor)
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend([created_at, campaign_id])
+
+        columns = "id, created_at, product, industry, platform, goal" + (", campaign" if include_campaign else "")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connection().execute(
+            f"SELECT {columns} FROM campaigns {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+
+        items = [self._row_to_item(row, include_campaign) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last[1], last[0])
+        return items, next_cursor
+
+    def get(self, campaign_id: int):
+        row = self._connection().execute(
+            "SELECT id, created_at, product, industry, platform, goal, campaign FROM campaigns WHERE id = ?",
+            (campaign_id,)
+        ).fetchone()
+        return self._row_to_item(row, True) if row is not None else None
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM campaigns").fetchone()[0]
+
+    @staticmethod
+    def _row_to_item(row, include_campaign: bool) -> dict:
+        item = {
+            "id": row[0],
+            "created_at": row[1],
+            "product": row[2],
+            "industry": row[3],
+            "platform": row[4],
+            "goal": row[5]
+        }
+        if include_campaign:
+            item["campaign"] = json.loads(row[6])
+        return item
+
+
+campaign_store = None
+store_queue = None
+
+if CAMPAIGN_STORE == "sqlite":
+    try:
+        campaign_store = SQLiteCampaignStore(CAMPAIGN_STORE_PATH)
+        store_queue = WriteBehindQueue(
+            campaign_store.write_many,
+            batch_size=PERSIST_BATCH_SIZE,
+            flush_interval=PERSIST_FLUSH_INTERVAL_SECONDS,
+            max_queued=PERSIST_MAX_QUEUED,
+            max_retries=PERSIST_MAX_RETRIES
+        )
+        store_queue.start()
+        atexit.register(store_queue.stop)
+        print(f"✓ Campaign store: SQLite at {CAMPAIGN_STORE_PATH}")
+    except Exception as e:
+        print(f"⚠️  Campaign store disabled: {e}")
+        campaign_store = store_queue = None
+
+
+def save_campaign(campaign: dict, metadata: dict = None):
+    """
+    Queue a generated campaign for the local store and Firebase (when configured).
+    metadata carries the indexed fields: product, industry, platform, goal.
+    """
+    if not has_budget("persistence", DEADLINE_MIN_PERSIST_SECONDS):
+        return
+
+    # The caller keeps editing its campaign (predictions, _meta) while the writers serialize theirs
+    campaign = copy.deepcopy(campaign)
+    metadata = metadata or {}
+    if store_queue is not None:
+        record = {key: metadata.get(key) for key in ("product",) + FILTER_COLUMNS}
+        record["created_at"] = time.time()
+        record["campaign"] = campaign
+        if not store_queue.put(record):
+            print("⚠️  Campaign store queue full, campaign not saved locally")
+
+    firebase_service.save_campaign({**campaign, "_metadata": metadata} if metadata else campaign)
+
+
+def stop():
+    """Flush queued writes to every backend"""
+    if store_queue is not None:
+        store_queue.stop()
+    if firebase_service.persistence_queue is not None:
+        firebase_service.persistence_queue.stop()
+
+
+def stats() -> dict:
+    return {
+        "backend": CAMPAIGN_STORE if campaign_store is not None else None,
+        "local_queue": store_queue.stats() if store_queue is not None else None,
+        "firebase_queue": firebase_service.persistence_stats()
+    }
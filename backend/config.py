@@ -5,4 +5,78 @@ load_dotenv()
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
+# Several keys (comma separated) spread calls over their quotas; defaults to GOOGLE_API_KEY alone
+GEMINI_API_KEYS = [key.strip() for key in os.getenv("GEMINI_API_KEYS", GOOGLE_API_KEY or "").split(",") if key.strip()]
+
+# Models in order of preference; later ones only take overflow
+GEMINI_MODELS = [
+    name.strip() for name in os.getenv("GEMINI_MODELS", "models/gemini-flash-lite-latest").split(",") if name.strip()
+]
+
+# Per key and model quota estimates (0 = unlimited) and how long a key rests after a quota error
+GEMINI_KEY_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_KEY_REQUESTS_PER_MINUTE", 15))
+GEMINI_KEY_TOKENS_PER_MINUTE = int(os.getenv("GEMINI_KEY_TOKENS_PER_MINUTE", 250000))
+GEMINI_KEY_DRAIN_SECONDS = float(os.getenv("GEMINI_KEY_DRAIN_SECONDS", 60))
+
+# Alternative Gemini REST endpoint, e.g. the local stand-in in benchmarks/fake_gemini.py
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
+
 # Don't raise error here - let it be handled gracefully in gemini_client
+
+# Persistent cache of Gemini campaign generations
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") != "0"
+RESPONSE_CACHE_PATH = os.getenv(
+    "RESPONSE_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "gemini_responses.sqlite3")
+)
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 5000))
+
+# Reuse of cached campaigns for near-duplicate briefs (same platform, content type and budget band)
+SIMILARITY_CACHE_ENABLED = os.getenv("SIMILARITY_CACHE_ENABLED", "1") != "0"
+SIMILARITY_CACHE_THRESHOLD = float(os.getenv("SIMILARITY_CACHE_THRESHOLD", 0.7))
+SIMILARITY_CACHE_MAX_ENTRIES = int(os.getenv("SIMILARITY_CACHE_MAX_ENTRIES", 5000))
+SIMILARITY_CACHE_PATH = os.getenv(
+    "SIMILARITY_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "similar_briefs.sqlite3")
+)
+# Mark reused campaigns with a "_reused" field (similarity and source)
+SIMILARITY_CACHE_FLAG_REUSED = os.getenv("SIMILARITY_CACHE_FLAG_REUSED", "1") != "0"
+
+# USD per million tokens, for cost accounting (defaults: Gemini Flash-Lite)
+GEMINI_PRICE_INPUT_PER_MTOK = float(os.getenv("GEMINI_PRICE_INPUT_PER_MTOK", 0.10))
+GEMINI_PRICE_OUTPUT_PER_MTOK = float(os.getenv("GEMINI_PRICE_OUTPUT_PER_MTOK", 0.40))
+
+# Gemini call resilience
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", 20))
+GEMINI_DEADLINE_SECONDS = float(os.getenv("GEMINI_DEADLINE_SECONDS", 40))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", 2))
+GEMINI_RETRY_BASE_DELAY = float(os.getenv("GEMINI_RETRY_BASE_DELAY", 0.5))
+GEMINI_RETRY_MAX_DELAY = float(os.getenv("GEMINI_RETRY_MAX_DELAY", 4))
+GEMINI_RETRY_BUDGET_RATIO = float(os.getenv("GEMINI_RETRY_BUDGET_RATIO", 0.2))
+GEMINI_BREAKER_THRESHOLD = int(os.getenv("GEMINI_BREAKER_THRESHOLD", 5))
+GEMINI_BREAKER_RESET_SECONDS = float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", 30))
+
+# Write-behind Firestore persistence
+PERSIST_BATCH_SIZE = min(int(os.getenv("PERSIST_BATCH_SIZE", 50)), 500)  # Firestore batch limit
+PERSIST_FLUSH_INTERVAL_SECONDS = float(os.getenv("PERSIST_FLUSH_INTERVAL_SECONDS", 1.0))
+PERSIST_MAX_QUEUED = int(os.getenv("PERSIST_MAX_QUEUED", 10000))
+PERSIST_MAX_RETRIES = int(os.getenv("PERSIST_MAX_RETRIES", 3))
+
+# Campaigns finished with less than this much of their request deadline left are not saved
+DEADLINE_MIN_PERSIST_SECONDS = float(os.getenv("DEADLINE_MIN_PERSIST_SECONDS", 0))
+
+# Local campaign history ("sqlite" or "none")
+CAMPAIGN_STORE = os.getenv("CAMPAIGN_STORE", "sqlite").lower()
+CAMPAIGN_STORE_PATH = os.getenv(
+    "CAMPAIGN_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "campaigns.sqlite3")
+)
+
+# Adaptive concurrency limit for Gemini calls (AIMD)
+GEMINI_LIMIT_INITIAL = float(os.getenv("GEMINI_LIMIT_INITIAL", 8))
+GEMINI_LIMIT_MIN = float(os.getenv("GEMINI_LIMIT_MIN", 1))
+GEMINI_LIMIT_MAX = float(os.getenv("GEMINI_LIMIT_MAX", 64))
+GEMINI_LIMIT_QUEUE_MAX = int(os.getenv("GEMINI_LIMIT_QUEUE_MAX", 100))
+GEMINI_LIMIT_BACKOFF = float(os.getenv("GEMINI_LIMIT_BACKOFF", 0.5))
+GEMINI_LIMIT_LATENCY_TOLERANCE = float(os.getenv("GEMINI_LIMIT_LATENCY_TOLERANCE", 2.0))
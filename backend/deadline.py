@@ -0,0 +1,81 @@
+"""
+Per-request deadlines.
+
+The API server opens one per request; every stage below it reads the time
+left through a contextvar (copied into the executor threads the server
+runs stages on), picks its cheaper fallback when the budget is too
+small, and records itself as degraded so the response can report it.
+"""
+
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class RequestDeadlineExceeded(TimeoutError):
+    """The caller's request deadline ran out; says nothing about the service being called"""
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.degraded = []
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def degrade(self, stage: str):
+        if stage not in self.degraded:
+            self.degraded.append(stage)
+
+
+_current = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def request_deadline(seconds: float):
+    """Run the enclosed work (and the threads it starts) under a deadline seconds from now"""
+    deadline = Deadline(seconds)
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def remaining() -> float:
+    """Seconds left for the current request; infinite outside of one"""
+    deadline = _current.get()
+    return deadline.remaining() if deadline is not None else math.inf
+
+
+def cap(expires_at: float) -> float:
+    """The earlier of expires_at (a time.monotonic() value) and the request deadline"""
+    deadline = _current.get()
+    return min(expires_at, deadline.expires_at) if deadline is not None else expires_at
+
+
+def has_budget(stage: str, seconds: float) -> bool:
+    """
+    True if at least seconds are left. Otherwise marks stage as degraded so
+    the caller can take its cheaper path.
+    """
+    deadline = _current.get()
+    if deadline is None or deadline.remaining() >= seconds:
+        return True
+    deadline.degrade(stage)
+    print(f"⏱️  {deadline.remaining():.2f}s left of the request deadline, degrading {stage}")
+    return False
+
+
+def mark_degraded(stage: str):
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.degrade(stage)
+
+
+def degraded_stages() -> list:
+    deadline = _current.get()
+    return list(deadline.degraded) if deadline is not None else []
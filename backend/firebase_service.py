@@ -1,8 +1,13 @@
 import firebase_admin
 from firebase_admin import credentials, firestore
 from datetime import datetime
+import atexit
 import os
 
+from backend.config import PERSIST_BATCH_SIZE, PERSIST_FLUSH_INTERVAL_SECONDS, PERSIST_MAX_QUEUED, PERSIST_MAX_RETRIES
+from backend.persistence_queue import WriteBehindQueue
+from metrics import span
+
 db = None
 
 try:
@@ -10,7 +15,14 @@ try:
     script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     key_path = os.path.join(script_dir, "firebase_key.json")
 
-    if os.path.exists(key_path):
+    if os.getenv("FIREBASE_ENABLED", "1") == "0":
+        print("⚠️  Firebase disabled (FIREBASE_ENABLED=0). Database features will be disabled.")
+    elif os.getenv("FIRESTORE_EMULATOR_HOST"):
+        # The Firestore client talks to the emulator without credentials
+        firebase_admin.initialize_app(options={"projectId": os.getenv("FIREBASE_PROJECT_ID", "brandpulse-local")})
+        db = firestore.client()
+        print(f"✓ Firebase initialized against emulator at {os.environ['FIRESTORE_EMULATOR_HOST']}")
+    elif os.path.exists(key_path):
         cred = credentials.Certificate(key_path)
         firebase_admin.initialize_app(cred)
         db = firestore.client()
@@ -21,16 +33,39 @@ except Exception as e:
     print(f"⚠️  Firebase initialization failed: {e}")
 
 
+def firestore_batch_writer(collection: str):
+    """Writer for WriteBehindQueue that commits each batch as one Firestore WriteBatch"""
+    def write(docs):
+        batch = db.batch()
+        for doc in docs:
+            batch.set(db.collection(collection).document(), doc)
+        with span("firestore_commit"):
+            batch.commit()
+    return write
+
+
+persistence_queue = None
+
+if db is not None:
+    persistence_queue = WriteBehindQueue(
+        firestore_batch_writer("campaigns"),
+        batch_size=PERSIST_BATCH_SIZE,
+        flush_interval=PERSIST_FLUSH_INTERVAL_SECONDS,
+        max_queued=PERSIST_MAX_QUEUED,
+        max_retries=PERSIST_MAX_RETRIES
+    )
+    persistence_queue.start()
+    atexit.register(persistence_queue.stop)
+
 
 def save_campaign(campaign_data: dict):
-    if db is None:
+    """Queue a campaign for persistence; returns immediately"""
+    if persistence_queue is None:
         return
-    
-    try:
-        db.collection("campaigns").add({
-            **campaign_data,
-            "created_at": datetime.utcnow()
-        })
-    except Exception as e:
-        print(f"⚠️  Failed to save campaign to Firebase: {e}")
 
+    if not persistence_queue.put({**campaign_data, "created_at": datetime.utcnow()}):
+        print("⚠️  Persistence queue full, campaign not saved to Firebase")
+
+
+def persistence_stats():
+    return persistence_queue.stats() if persistence_queue is not None else None
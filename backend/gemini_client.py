@@ -1,26 +1,255 @@
 import os
-from backend.config import GOOGLE_API_KEY
+import time
+from backend.config import (
+    GEMINI_API_KEYS,
+    GEMINI_MODELS,
+    GEMINI_KEY_REQUESTS_PER_MINUTE,
+    GEMINI_KEY_TOKENS_PER_MINUTE,
+    GEMINI_KEY_DRAIN_SECONDS,
+    GEMINI_API_ENDPOINT,
+    GEMINI_TIMEOUT_SECONDS,
+    GEMINI_DEADLINE_SECONDS,
+    GEMINI_MAX_RETRIES,
+    GEMINI_RETRY_BASE_DELAY,
+    GEMINI_RETRY_MAX_DELAY,
+    GEMINI_RETRY_BUDGET_RATIO,
+    GEMINI_BREAKER_THRESHOLD,
+    GEMINI_BREAKER_RESET_SECONDS,
+    GEMINI_LIMIT_INITIAL,
+    GEMINI_LIMIT_MIN,
+    GEMINI_LIMIT_MAX,
+    GEMINI_LIMIT_QUEUE_MAX,
+    GEMINI_LIMIT_BACKOFF,
+    GEMINI_LIMIT_LATENCY_TOLERANCE,
+)
+from backend.gemini_pool import GeminiPool, PoolExhausted, make_gemini_model, response_tokens
+from backend.resilience import (
+    AdaptiveLimiter,
+    AdmissionRejected,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    backoff_delay,
+    current_priority,
+)
+from backend.deadline import RequestDeadlineExceeded
+from backend.deadline import cap as cap_deadline
+from backend.usage import usage_store
+from metrics import CallbackCounter, Gauge, register, span
 
 GEMINI_AVAILABLE = False
+pool = None
 
 try:
-    import google.generativeai as genai
-    
-    if GOOGLE_API_KEY:
-        genai.configure(api_key=GOOGLE_API_KEY)
-        model = genai.GenerativeModel("models/gemini-flash-lite-latest")
+    if GEMINI_API_KEYS:
+        pool = GeminiPool(
+            GEMINI_API_KEYS,
+            GEMINI_MODELS,
+            lambda key, model_name: make_gemini_model(key, model_name, GEMINI_API_ENDPOINT),
+            requests_per_minute=GEMINI_KEY_REQUESTS_PER_MINUTE,
+            tokens_per_minute=GEMINI_KEY_TOKENS_PER_MINUTE,
+            drain_seconds=GEMINI_KEY_DRAIN_SECONDS
+        )
+        if GEMINI_API_ENDPOINT:
+            print(f"✓ Gemini requests go to {GEMINI_API_ENDPOINT}")
+        print(f"✓ Gemini pool: {len(GEMINI_API_KEYS)} key(s) x {', '.join(GEMINI_MODELS)}")
         GEMINI_AVAILABLE = True
     else:
-        model = None
         print("⚠️  GOOGLE_API_KEY not found. Gemini features will use demo mode.")
 except Exception as e:
-    model = None
+    pool = None
     print(f"⚠️  Gemini initialization error: {e}")
 
 
-def gemini_generate(prompt: str) -> str:
-    if not GEMINI_AVAILABLE or model is None:
+breaker = CircuitBreaker(GEMINI_BREAKER_THRESHOLD, GEMINI_BREAKER_RESET_SECONDS)
+retry_budget = RetryBudget(GEMINI_RETRY_BUDGET_RATIO)
+
+limiter = AdaptiveLimiter(
+    initial_limit=GEMINI_LIMIT_INITIAL,
+    min_limit=GEMINI_LIMIT_MIN,
+    max_limit=GEMINI_LIMIT_MAX,
+    max_queue=GEMINI_LIMIT_QUEUE_MAX,
+    backoff=GEMINI_LIMIT_BACKOFF,
+    latency_tolerance=GEMINI_LIMIT_LATENCY_TOLERANCE
+)
+register(Gauge("brandpulse_gemini_concurrency_limit", "Current adaptive Gemini concurrency limit",
+               lambda: round(limiter.limit, 2)))
+register(Gauge("brandpulse_gemini_in_flight", "Gemini calls holding a concurrency slot",
+               lambda: limiter.in_flight))
+register(Gauge("brandpulse_gemini_queue_depth", "Gemini calls waiting for a concurrency slot",
+               lambda: limiter.stats()["queue_depth"]))
+register(CallbackCounter("brandpulse_gemini_admission_total", "Gemini admission decisions and overload signals",
+                         "result", lambda: dict(limiter.counts)))
+
+# Errors that will fail the same way on every attempt
+NON_RETRYABLE_ERRORS = {"InvalidArgument", "PermissionDenied", "Unauthenticated", "NotFound", "BadRequest",
+                        "PoolExhausted"}
+
+# Errors that signal the shared quota or the upstream is saturated
+OVERLOAD_ERRORS = {"ResourceExhausted", "TooManyRequests", "PoolExhausted"}
+TIMEOUT_ERRORS = {"DeadlineExceeded", "GatewayTimeout", "TimeoutError", "ReadTimeout"}
+
+
+def gemini_generate(prompt: str, usage: dict = None) -> str:
+    """usage labels the call for token accounting: operation, industry, platform, template_tokens"""
+    if not GEMINI_AVAILABLE or pool is None:
+        raise RuntimeError("Gemini API not configured. Set GOOGLE_API_KEY in .env file.")
+
+    # The caller's request deadline wins when it is earlier
+    own_deadline = time.monotonic() + GEMINI_DEADLINE_SECONDS
+    deadline = cap_deadline(own_deadline)
+    request_bound = deadline < own_deadline
+    if deadline <= time.monotonic():
+        raise RequestDeadlineExceeded("Request deadline passed before the Gemini call")
+    # Shed before touching the breaker so a rejected call never holds its half-open probe
+    limiter.acquire(deadline, current_priority())
+    if not breaker.allow_request():
+        limiter.release()
+        raise CircuitOpenError("Gemini circuit breaker is open; skipping the call")
+
+    retry_budget.record_call()
+    last_error = None
+
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        if attempt > 0:
+            try:
+                limiter.acquire(deadline, current_priority())
+            except AdmissionRejected:
+                break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            limiter.release()
+            break
+        timeout = min(GEMINI_TIMEOUT_SECONDS, remaining)
+        # A timeout shortened by the caller's deadline is the caller's, not Gemini's
+        cut_by_request = request_bound and timeout < GEMINI_TIMEOUT_SECONDS
+        started = time.monotonic()
+        slot = None
+        try:
+            slot = pool.acquire()
+            with span("gemini_call"):
+                response = slot.model.generate_content(
+                    prompt,
+                    request_options={"timeout": timeout}
+                )
+                text = response.text
+            latency = time.monotonic() - started
+            pool.record_tokens(slot, response_tokens(response))
+            usage_store.record(usage, slot.model_name, prompt, text, response.usage_metadata, latency)
+            limiter.release(latency=latency)
+            breaker.record_success()
+            return text
+        except Exception as e:
+            if cut_by_request and type(e).__name__ in TIMEOUT_ERRORS:
+                limiter.release()
+                last_error = RequestDeadlineExceeded(f"Request deadline reached during the Gemini call ({e})")
+                break
+            release_after_error(e, time.monotonic() - started, slot)
+            last_error = e
+            if type(e).__name__ in NON_RETRYABLE_ERRORS:
+                break
+            if attempt == GEMINI_MAX_RETRIES or not retry_budget.try_spend():
+                break
+            delay = backoff_delay(attempt, GEMINI_RETRY_BASE_DELAY, GEMINI_RETRY_MAX_DELAY)
+            if time.monotonic() + delay >= deadline:
+                break
+            print(f"⚠️  Gemini attempt {attempt + 1} failed ({e}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+    if last_error is None:
+        if request_bound:
+            last_error = RequestDeadlineExceeded("Request deadline exceeded before Gemini answered")
+        else:
+            last_error = TimeoutError("Gemini deadline exceeded")
+    record_failure(last_error)
+    raise last_error
+
+
+def record_failure(error: Exception):
+    """Count a failed call against the breaker, unless it says nothing about Gemini's health"""
+    if isinstance(error, (PoolExhausted, RequestDeadlineExceeded)):
+        # Every local key is drained, or the caller ran out of time
+        breaker.release_probe()
+    else:
+        breaker.record_failure()
+
+
+def release_after_error(error: Exception, elapsed: float, slot=None):
+    """
+    Feed a failed call to the pool and the limiter. A quota error drains its
+    key; it only pushes the concurrency limit down once no key is left.
+    Timeouts push it down as slow calls.
+    """
+    name = type(error).__name__
+    if name in OVERLOAD_ERRORS:
+        if slot is not None:
+            pool.drain(slot)
+        limiter.release(overloaded=not pool.available())
+    elif name in TIMEOUT_ERRORS:
+        limiter.release(latency=elapsed)
+    else:
+        limiter.release()
+
+
+def gemini_generate_stream(prompt: str, usage: dict = None):
+    """
+    Yields response text chunks as Gemini produces them.
+    A partially consumed stream cannot be replayed, so there are no retries.
+    """
+    if not GEMINI_AVAILABLE or pool is None:
         raise RuntimeError("Gemini API not configured. Set GOOGLE_API_KEY in .env file.")
-    
-    response = model.generate_content(prompt)
-    return response.text
+
+    own_deadline = time.monotonic() + GEMINI_DEADLINE_SECONDS
+    deadline = cap_deadline(own_deadline)
+    request_bound = deadline < own_deadline
+    if deadline <= time.monotonic():
+        raise RequestDeadlineExceeded("Request deadline passed before the Gemini stream")
+    limiter.acquire(deadline, current_priority())
+    if not breaker.allow_request():
+        limiter.release()
+        raise CircuitOpenError("Gemini circuit breaker is open; skipping the call")
+
+    retry_budget.record_call()
+    started = time.monotonic()
+    slot = None
+    tokens = 0
+    last_usage = None
+    chunks = []
+    completed = failed = False
+    try:
+        slot = pool.acquire()
+        response = slot.model.generate_content(
+            prompt,
+            stream=True,
+            request_options={"timeout": max(deadline - started, 0.001)}
+        )
+        for chunk in response:
+            # Each chunk carries the running usage; the last one has the total
+            tokens = response_tokens(chunk) or tokens
+            last_usage = chunk.usage_metadata or last_usage
+            chunks.append(chunk.text)
+            yield chunk.text
+        completed = True
+    except Exception as e:
+        failed = True
+        if request_bound and type(e).__name__ in TIMEOUT_ERRORS:
+            limiter.release()
+            breaker.release_probe()
+            raise RequestDeadlineExceeded(f"Request deadline reached during the Gemini stream ({e})") from e
+        release_after_error(e, time.monotonic() - started, slot)
+        record_failure(e)
+        raise
+    finally:
+        # Chunks already received were billed even if the stream did not finish
+        if slot is not None and (completed or chunks):
+            pool.record_tokens(slot, tokens)
+            usage_store.record(usage, slot.model_name, prompt, "".join(chunks), last_usage,
+                               time.monotonic() - started)
+        if not failed:
+            # A streamed call's duration is not comparable with generate_content latency
+            limiter.release()
+            if completed:
+                breaker.record_success()
+            else:
+                # Consumer closed the stream early; that says nothing about Gemini's health
+                breaker.release_probe()
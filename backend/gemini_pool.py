@@ -0,0 +1,177 @@
+"""
+Pool of Gemini clients across several API keys and models.
+
+Every (key, model) pair is a slot with its own sliding-window request and
+token counts. Calls go to the slot with the most quota headroom on the
+first model that has any, so extra models (e.g. a lite model) only take
+overflow. A slot that answers with a quota error is drained for a while.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class PoolExhausted(RuntimeError):
+    """Every slot is drained after quota errors"""
+
+
+def mask_key(key: str) -> str:
+    return f"...{key[-4:]}" if len(key) > 4 else "..."
+
+
+class KeyedGeminiModel:
+    """
+    generate_content() for one model on its own API key. Built on the public
+    generativelanguage client, since genai.configure() holds a single
+    process-wide key.
+    """
+
+    def __init__(self, api_key: str, model_name: str, endpoint: str = None):
+        from google.ai import generativelanguage as glm
+
+        client_options = {"api_key": api_key}
+        if endpoint:
+            client_options["api_endpoint"] = endpoint
+        self.model_name = model_name if "/" in model_name else f"models/{model_name}"
+        self.client = glm.GenerativeServiceClient(
+            client_options=client_options,
+            transport="rest" if endpoint else None
+        )
+
+    def generate_content(self, prompt: str, stream: bool = False, request_options: dict = None):
+        """Same call and response types as GenerativeModel.generate_content for a text prompt"""
+        from google.ai import generativelanguage as glm
+        from google.generativeai.types import GenerateContentResponse
+
+        request = glm.GenerateContentRequest(
+            model=self.model_name,
+            contents=[glm.Content(role="user", parts=[glm.Part(text=prompt)])]
+        )
+        if stream:
+            return GenerateContentResponse.from_iterator(
+                self.client.stream_generate_content(request, **(request_options or {}))
+            )
+        return GenerateContentResponse.from_response(self.client.generate_content(request, **(request_options or {})))
+
+
+def make_gemini_model(api_key: str, model_name: str, endpoint: str = None):
+    """A Gemini model bound to its own API key instead of the global genai.configure() client"""
+    return KeyedGeminiModel(api_key, model_name, endpoint)
+
+
+class KeySlot:
+    def __init__(self, label: str, model_name: str, model, requests_per_minute: int, tokens_per_minute: int,
+                 window: float):
+        self.label = label
+        self.model_name = model_name
+        self.model = model
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window = window
+        self.requests = deque()  # call start times
+        self.tokens = deque()  # (time, tokens)
+        self.token_total = 0
+        self.drained_until = 0.0
+        self.counts = {"calls": 0, "tokens": 0, "quota_errors": 0}
+
+    def _expire(self, now: float):
+        while self.requests and self.requests[0] <= now - self.window:
+            self.requests.popleft()
+        while self.tokens and self.tokens[0][0] <= now - self.window:
+            self.token_total -= self.tokens.popleft()[1]
+
+    def headroom(self, now: float) -> float:
+        """Share of the tighter of the two quotas still free in the current window"""
+        self._expire(now)
+        request_room = 1 - len(self.requests) / self.requests_per_minute if self.requests_per_minute else 1.0
+        token_room = 1 - self.token_total / self.tokens_per_minute if self.tokens_per_minute else 1.0
+        return min(request_room, token_room)
+
+    def stats(self, now: float) -> dict:
+        return {
+            "key": self.label,
+            "model": self.model_name,
+            "window_requests": len(self.requests),
+            "window_tokens": self.token_total,
+            "headroom": round(self.headroom(now), 3),
+            "drained_for_seconds": round(max(0.0, self.drained_until - now), 1),
+            **self.counts
+        }
+
+
+class GeminiPool:
+    """
+    Routes Gemini calls over keys x models. make_model(key, model_name)
+    builds the client for a slot, so tests can hand in stubs.
+    """
+
+    def __init__(self, api_keys, model_names, make_model, requests_per_minute: int = 0,
+                 tokens_per_minute: int = 0, drain_seconds: float = 60.0, window: float = 60.0):
+        self.model_names = list(model_names)
+        self.drain_seconds = drain_seconds
+        self.slots = []
+        for i, key in enumerate(api_keys):
+            for model_name in self.model_names:
+                self.slots.append(KeySlot(
+                    f"key{i + 1} ({mask_key(key)})", model_name, make_model(key, model_name),
+                    requests_per_minute, tokens_per_minute, window
+                ))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.slots)
+
+    def acquire(self) -> KeySlot:
+        """Pick the slot for the next call and count the request against it"""
+        now = time.monotonic()
+        with self._lock:
+            live = [slot for slot in self.slots if slot.drained_until <= now]
+            if not live:
+                raise PoolExhausted("All Gemini keys are drained after quota errors")
+            best = None
+            for model_name in self.model_names:
+                candidates = [slot for slot in live if slot.model_name == model_name]
+                best = max(candidates, key=lambda slot: slot.headroom(now), default=None)
+                if best is not None and best.headroom(now) > 0:
+                    break
+            else:
+                # Every live slot is at its local estimate; let the upstream decide
+                best = max(live, key=lambda slot: slot.headroom(now))
+            best.requests.append(now)
+            best.counts["calls"] += 1
+            return best
+
+    def record_tokens(self, slot: KeySlot, tokens: int):
+        if not tokens:
+            return
+        with self._lock:
+            slot.tokens.append((time.monotonic(), tokens))
+            slot.token_total += tokens
+            slot.counts["tokens"] += tokens
+
+    def drain(self, slot: KeySlot):
+        """Take a slot out of rotation after a quota error"""
+        with self._lock:
+            slot.drained_until = time.monotonic() + self.drain_seconds
+            slot.counts["quota_errors"] += 1
+        print(f"⚠️  Gemini {slot.label} / {slot.model_name} hit its quota; draining for {self.drain_seconds:.0f}s")
+
+    def available(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            return any(slot.drained_until <= now for slot in self.slots)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "models": self.model_names,
+                "slots": [slot.stats(now) for slot in self.slots]
+            }
+
+
+def response_tokens(response) -> int:
+    """total_token_count from a response's usage metadata, 0 when absent"""
+    usage = getattr(response, "usage_metadata", None)
+    return getattr(usage, "total_token_count", 0) or 0
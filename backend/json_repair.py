@@ -0,0 +1,154 @@
+import re
+import threading
+
+FENCE_RE = re.compile(r"^\s*```[a-zA-Z]*\s*|\s*```\s*$")
+
+
+class RepairStats:
+    """How model outputs were parsed: as-is, after local repair, or via a fix-up call"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"clean": 0, "repaired": 0, "fix_retry_saved": 0, "failed": 0}
+
+    def record(self, outcome: str):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        saved = counts["repaired"] + counts["fix_retry_saved"]
+        counts["saved_rate"] = round(saved / total, 3) if total else 0.0
+        return counts
+
+
+repair_stats = RepairStats()
+
+
+def strip_wrapping(text: str) -> str:
+    """Drop markdown fences and any prose before the first '{' or after the last '}'"""
+    text = FENCE_RE.sub("", text.strip())
+    start = text.find("{")
+    if start == -1:
+        return text
+    end = text.rfind("}")
+    return text[start:end + 1] if end > start else text[start:]
+
+
+def repair_json(text: str) -> str:
+    """
+    Best-effort fix of the syntax faults models typically make: trailing
+    commas, raw control characters inside strings, and output truncated
+    mid-string or mid-object (a dangling key is dropped, open strings and
+    brackets are closed).
+    """
+    text = strip_wrapping(text)
+    out = []
+    # One frame per open container: [closer, state, index where the current key starts]
+    # Object states: "key" -> "colon" -> "value" -> "next"; arrays stay "array"
+    stack = []
+    in_string = False
+    escape = False
+
+    for c in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+                if stack and stack[-1][1] == "key":
+                    stack[-1][1] = "colon"
+            elif c in "\n\r\t":
+                c = " "
+            out.append(c)
+            continue
+
+        frame = stack[-1] if stack else None
+        if c == '"':
+            in_string = True
+            if frame is not None and frame[1] == "key":
+                frame[2] = len(out)
+            elif frame is not None and frame[1] == "value":
+                frame[1] = "next"
+        elif c in "{[":
+            if frame is not None and frame[1] == "value":
+                frame[1] = "next"
+            stack.append(["}", "key", None] if c == "{" else ["]", "array", None])
+        elif c in "}]":
+            _drop_trailing_comma(out)
+            if stack:
+                stack.pop()
+        elif c == ":" and frame is not None and frame[1] == "colon":
+            frame[1] = "value"
+        elif c == "," and frame is not None and frame[1] != "array":
+            frame[1] = "key"
+        elif not c.isspace() and frame is not None and frame[1] == "value":
+            frame[1] = "next"
+        out.append(c)
+
+    if stack and stack[-1][1] in ("key", "colon", "value") and stack[-1][2] is not None \
+            and (stack[-1][1] != "key" or in_string):
+        # Truncated inside a key or before its value: drop the member
+        del out[stack[-1][2]:]
+        in_string = False
+    elif in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+
+    repaired = "".join(out).rstrip()
+    while repaired.endswith((",", ":")):
+        repaired = repaired[:-1].rstrip()
+    return repaired + "".join(frame[0] for frame in reversed(stack))
+
+
+def _drop_trailing_comma(out: list):
+    i = len(out) - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    if i >= 0 and out[i] == ",":
+        del out[i]
+
+
+def validate_json(schema, text: str):
+    """Parse and validate text against a pydantic model in one step"""
+    if hasattr(schema, "model_validate_json"):
+        return schema.model_validate_json(text)
+    return schema.parse_raw(text)
+
+
+def parse_model_output(schema, raw_output: str, fix_call=None):
+    """
+    Validates raw model output against schema. Tries the output as-is, then a
+    locally repaired copy, then (if fix_call is given) one round trip asking
+    the model to fix its own output. fix_call(raw_output, error) returns the
+    corrected text. Raises the last validation error if all of that fails.
+    """
+    try:
+        result = validate_json(schema, raw_output)
+        repair_stats.record("clean")
+        return result
+    except ValueError as e:
+        error = e
+
+    try:
+        result = validate_json(schema, repair_json(raw_output))
+        repair_stats.record("repaired")
+        return result
+    except ValueError as e:
+        error = e
+
+    if fix_call is not None:
+        try:
+            result = validate_json(schema, repair_json(fix_call(raw_output, error)))
+            repair_stats.record("fix_retry_saved")
+            return result
+        except Exception as e:
+            error = e
+
+    repair_stats.record("failed")
+    raise error
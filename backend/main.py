@@ -21,12 +21,12 @@
 
 #     save_campaign(campaign)
 #     return campaign
-from backend.orchestrator import generate_campaign
-from backend.firebase_service import save_campaign
+from backend.orchestrator import generate_campaign_with_source, regenerate_section, stream_campaign
+from backend.campaign_store import save_campaign
 
 
-def run_brandpulse(user_input: dict):
-    brief = f"""
+def build_brief(user_input: dict) -> str:
+    return f"""
 Product: {user_input['product']}
 Target Audience: {user_input['audience']}
 Goal: {user_input['goal']}
@@ -38,8 +38,53 @@ Content Type: {user_input['content_type']}
 """
 
 
-    campaign = generate_campaign(brief)
+def campaign_metadata(user_input: dict) -> dict:
+    """Indexed fields stored alongside a saved campaign"""
+    return {key: user_input.get(key) for key in ("product", "industry", "platform", "goal")}
+
+
+def usage_labels(user_input: dict) -> dict:
+    """Brief fields Gemini token usage is broken down by"""
+    return {"industry": user_input.get("industry"), "platform": user_input.get("platform")}
+
+
+def run_brandpulse(user_input: dict, use_cache: bool = True):
+    return run_brandpulse_with_source(user_input, use_cache=use_cache)[0]
+
+
+def run_brandpulse_with_source(user_input: dict, use_cache: bool = True, save: bool = True) -> tuple:
+    """
+    (campaign, source) as in generate_campaign_with_source. save=False leaves
+    storing a new campaign to the caller.
+    """
+    brief = build_brief(user_input)
+
+    campaign, source = generate_campaign_with_source(brief, use_cache=use_cache, usage=usage_labels(user_input))
 
     # No image generation (Gemini generates prompt only)
-    save_campaign(campaign)
-    return campaign
+    # Cached and shared campaigns were saved by the request that generated them
+    if save and source == "gemini":
+        save_campaign(campaign, campaign_metadata(user_input))
+    return campaign, source
+
+
+def stream_brandpulse(user_input: dict, use_cache: bool = True):
+    """Streaming run_brandpulse: yields (section_name, section) as they are ready"""
+    campaign = {}
+    sections = stream_campaign(build_brief(user_input), use_cache=use_cache, usage=usage_labels(user_input))
+    while True:
+        try:
+            name, section = next(sections)
+        except StopIteration as done:
+            source = done.value
+            break
+        campaign[name] = section
+        yield name, section
+
+    if source == "gemini":
+        save_campaign(campaign, campaign_metadata(user_input))
+
+
+def regenerate_brandpulse_section(user_input: dict, campaign: dict, section: str, feedback: str = None):
+    """Regenerates one section of a campaign produced from the same brief"""
+    return regenerate_section(build_brief(user_input), campaign, section, feedback, usage=usage_labels(user_input))
@@ -24,16 +24,207 @@
 #     return validated_output.dict()
 
 import json
-from backend.prompts import MASTER_PROMPT
-from backend.schemas import CampaignOutput
-from backend.gemini_client import gemini_generate
+from backend.prompts import CAMPAIGN_FORMAT, FIX_JSON_PROMPT, MASTER_PROMPT, SECTION_FORMATS, SECTION_LOGIC, SECTION_PROMPT
+from backend.schemas import CampaignOutput, SECTION_SCHEMAS
+from backend.gemini_client import gemini_generate, gemini_generate_stream
+from backend.stream_parser import SectionStreamParser
+from backend.json_repair import parse_model_output
+from backend.cache import cache_key, response_cache
+from backend.config import SIMILARITY_CACHE_FLAG_REUSED
+from backend.similarity_cache import similarity_index
+from backend.singleflight import SingleFlight
+from backend.usage import estimate_tokens, usage_store
+from metrics import record_cache, span
 
+# Identical briefs generating at the same time share one Gemini call
+campaign_flights = SingleFlight()
+
+# Estimated tokens of the fixed instructions sent with every campaign generation
+MASTER_PROMPT_TOKENS = estimate_tokens(MASTER_PROMPT)
+
+
+def call_usage(usage: dict, operation: str, template_tokens: int = 0) -> dict:
+    """Token accounting labels for one Gemini call; usage holds the brief's industry and platform"""
+    return {**(usage or {}), "operation": operation, "template_tokens": template_tokens}
+
+
+def generate_campaign(user_brief: str, use_cache: bool = True, usage: dict = None) -> dict:
+    return generate_campaign_with_source(user_brief, use_cache, usage)[0]
+
+
+def generate_campaign_with_source(user_brief: str, use_cache: bool = True, usage: dict = None) -> tuple:
+    """
+    (campaign, source) where source is "cache", "similar", "coalesced" (shared
+    with an identical brief generating at the same time) or "gemini". Only
+    "gemini" campaigns are new.
+    """
+    key = cache_key(user_brief)
+    if use_cache and response_cache is not None:
+        cached = response_cache.get(key)
+        record_cache("gemini_response", cached is not None)
+        if cached is not None:
+            usage_store.record_cache_hit(call_usage(usage, "campaign"))
+            return cached, "cache"
+
+        similar = find_similar(user_brief)
+        if similar is not None:
+            usage_store.record_cache_hit(call_usage(usage, "campaign_similar"))
+            return similar, "similar"
+
+    campaign, leader = campaign_flights.run(key, lambda: generate_uncached(user_brief, key, usage))
+    return campaign, "gemini" if leader else "coalesced"
+
+
+def find_similar(user_brief: str):
+    """Cached campaign of a near-duplicate brief, or None"""
+    if similarity_index is None:
+        return None
+    match = similarity_index.find(user_brief)
+    campaign = response_cache.get(match[0], count=False) if match is not None else None
+    if match is not None and campaign is None:
+        # Expired or evicted from the response cache
+        similarity_index.discard(match[0])
+    if campaign is not None:
+        similarity_index.record_hit(match[0])
+    else:
+        similarity_index.record_miss()
+    record_cache("gemini_similar", campaign is not None)
+    if campaign is not None and SIMILARITY_CACHE_FLAG_REUSED:
+        campaign["_reused"] = {"similarity": round(match[1], 3), "source": match[0][:12]}
+    return campaign
+
+
+def json_fixer(output_format: str, usage: dict = None):
+    """fix_call for parse_model_output: asks Gemini to correct its own output"""
+    template_tokens = estimate_tokens(FIX_JSON_PROMPT.format(error="", format=output_format, output=""))
+
+    def fix(raw_output: str, error: Exception) -> str:
+        print(f"⚠️  Gemini output failed validation after repair, requesting a fix: {str(error)[:200]}")
+        return gemini_generate(
+            FIX_JSON_PROMPT.format(error=error, format=output_format, output=raw_output),
+            usage=call_usage(usage, "json_fix", template_tokens)
+        )
+    return fix
+
+
+def generate_uncached(user_brief: str, key: str, usage: dict = None) -> dict:
+    full_prompt = MASTER_PROMPT + "\n\nUSER BRIEF:\n" + user_brief
+    raw_output = gemini_generate(full_prompt, usage=call_usage(usage, "campaign", MASTER_PROMPT_TOKENS))
+
+    with span("json_validate"):
+        validated = parse_model_output(CampaignOutput, raw_output, fix_call=json_fixer(CAMPAIGN_FORMAT, usage))
+    campaign = validated.dict()
+
+    # Bypassing only skips the lookup; a fresh generation still refreshes the entry
+    if response_cache is not None:
+        response_cache.set(key, campaign)
+        if similarity_index is not None:
+            similarity_index.add(key, user_brief)
+
+    return campaign
+
+
+def stream_campaign(user_brief: str, use_cache: bool = True, usage: dict = None):
+    """
+    Yields (section_name, section) for each top-level section as soon as it
+    has streamed in and validated against its own schema. Returns "cache" or
+    "gemini" depending on where the sections came from.
+    """
+    key = cache_key(user_brief)
+    if use_cache and response_cache is not None:
+        cached = response_cache.get(key)
+        record_cache("gemini_response", cached is not None)
+        if cached is not None:
+            usage_store.record_cache_hit(call_usage(usage, "campaign_stream"))
+            yield from cached.items()
+            return "cache"
 
-def generate_campaign(user_brief: str) -> dict:
     full_prompt = MASTER_PROMPT + "\n\nUSER BRIEF:\n" + user_brief
-    raw_output = gemini_generate(full_prompt)
+    parser = SectionStreamParser()
+    sections = {}
+
+    for chunk in gemini_generate_stream(full_prompt, usage=call_usage(usage, "campaign_stream", MASTER_PROMPT_TOKENS)):
+        for name, value in parser.feed(chunk):
+            schema = SECTION_SCHEMAS.get(name)
+            if schema is None:
+                continue
+            sections[name] = schema(**value).dict()
+            yield name, sections[name]
+
+    campaign = CampaignOutput(**sections).dict()
+    if response_cache is not None:
+        response_cache.set(key, campaign)
+    return "gemini"
+
+
+# Limits on how much of the other sections is sent as context
+CONTEXT_MAX_STRING = 120
+CONTEXT_MAX_ITEMS = 2
+
+
+def compact_section(value):
+    """Shortened copy of a section: long strings truncated, lists capped"""
+    if isinstance(value, dict):
+        return {k: compact_section(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [compact_section(v) for v in value[:CONTEXT_MAX_ITEMS]]
+    if isinstance(value, str) and len(value) > CONTEXT_MAX_STRING:
+        return value[:CONTEXT_MAX_STRING].rstrip() + "…"
+    return value
+
+
+def known_fields(name: str, value):
+    """Section reduced to its schema's fields, or None if it does not validate"""
+    try:
+        return SECTION_SCHEMAS[name](**value).dict()
+    except Exception:
+        return None
+
+
+def section_template_tokens(section: str) -> int:
+    """Estimated tokens of a section prompt without the brief, context and current version"""
+    return estimate_tokens(SECTION_PROMPT.format(
+        section=section, logic=SECTION_LOGIC[section], format=SECTION_FORMATS[section],
+        brief="", context="", current=""
+    ))
+
+
+def build_section_prompt(user_brief: str, campaign: dict, section: str, feedback: str = None) -> str:
+    context = {}
+    for name, value in campaign.items():
+        if name != section and name in SECTION_SCHEMAS:
+            value = known_fields(name, value)
+            if value is not None:
+                context[name] = compact_section(value)
+    current = known_fields(section, campaign.get(section) or {})
+
+    prompt = SECTION_PROMPT.format(
+        section=section,
+        logic=SECTION_LOGIC[section],
+        format=SECTION_FORMATS[section],
+        brief=user_brief.strip(),
+        context=json.dumps(context, ensure_ascii=False, separators=(",", ":")),
+        current=json.dumps(current, ensure_ascii=False, separators=(",", ":"))
+    )
+    if feedback:
+        prompt += "USER FEEDBACK ON THE CURRENT VERSION:\n" + feedback.strip() + "\n"
+    return prompt
+
 
-    parsed_json = json.loads(raw_output)
-    validated = CampaignOutput(**parsed_json)
+def regenerate_section(user_brief: str, campaign: dict, section: str, feedback: str = None,
+                       usage: dict = None) -> dict:
+    """
+    Regenerates one top-level section of an existing campaign and validates
+    it against that section's schema only.
+    """
+    if section not in SECTION_SCHEMAS:
+        raise ValueError(f"Unknown section '{section}'. Expected one of: {', '.join(SECTION_SCHEMAS)}")
 
-    return validated.dict()
+    raw_output = gemini_generate(
+        build_section_prompt(user_brief, campaign, section, feedback),
+        usage=call_usage(usage, "section", section_template_tokens(section))
+    )
+    schema = SECTION_SCHEMAS[section]
+    with span("json_validate"):
+        fix_call = json_fixer(SECTION_FORMATS[section], usage)
+        return parse_model_output(schema, raw_output, fix_call=fix_call).dict()
@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import deque
+
+from backend.resilience import backoff_delay
+
+
+class WriteBehindQueue:
+    """
+    Accepts documents without blocking and hands them to writer(docs) in
+    batches from a background thread. A batch is flushed once batch_size
+    documents are waiting or the oldest has waited flush_interval seconds.
+    A failed batch is retried with backoff up to max_retries times, then
+    dropped. stop() flushes whatever is still queued.
+    """
+
+    def __init__(self, writer, batch_size: int = 50, flush_interval: float = 1.0,
+                 max_queued: int = 10000, max_retries: int = 3,
+                 retry_base_delay: float = 0.5, retry_max_delay: float = 8.0):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+
+        self._pending = deque()
+        self._oldest_at = None
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._in_flight = 0
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.last_flush_ms = None
+        self._flush_ms_total = 0.0
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Flush everything still queued and stop the writer thread"""
+        with self._cond:
+            thread = self._thread
+            if thread is None:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+        thread.join(timeout)
+        with self._cond:
+            self._thread = None
+
+    def put(self, doc: dict) -> bool:
+        """Queue doc for writing; returns False (and drops it) if the queue is full"""
+        with self._cond:
+            if len(self._pending) >= self.max_queued:
+                self.dropped += 1
+                return False
+            if not self._pending:
+                self._oldest_at = time.monotonic()
+            self._pending.append(doc)
+            self.enqueued += 1
+            # An idle writer waits without a timeout, so the first document must
+            # wake it to start the flush_interval timer; a full batch flushes now
+            if len(self._pending) == 1 or len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until everything queued so far has been written or dropped"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._oldest_at = time.monotonic() - self.flush_interval if self._pending else None
+            self._cond.notify_all()
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _next_batch(self):
+        with self._cond:
+            while True:
+                if self._pending:
+                    due = self._oldest_at + self.flush_interval
+                    if self._stopping or len(self._pending) >= self.batch_size or time.monotonic() >= due:
+                        break
+                    self._cond.wait(due - time.monotonic())
+                elif self._stopping:
+                    return None
+                else:
+                    self._cond.wait()
+
+            count = min(self.batch_size, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(count)]
+            self._oldest_at = time.monotonic() if self._pending else None
+            self._in_flight = count
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._write(batch)
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def _write(self, batch):
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                self.writer(batch)
+            except Exception as e:
+                with self._cond:
+                    self.failed_flushes += 1
+                if attempt == self.max_retries:
+                    print(f"⚠️  Dropping {len(batch)} queued writes after {attempt + 1} attempts: {e}")
+                    with self._cond:
+                        self.dropped += len(batch)
+                    return
+                print(f"⚠️  Batched write failed (attempt {attempt + 1}), retrying: {e}")
+                time.sleep(backoff_delay(attempt, self.retry_base_delay, self.retry_max_delay))
+                continue
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._cond:
+                self.flushes += 1
+                self.written += len(batch)
+                self.last_flush_ms = round(elapsed_ms, 2)
+                self._flush_ms_total += elapsed_ms
+            return
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "queue_depth": len(self._pending) + self._in_flight,
+                "max_queued": self.max_queued,
+                "batch_size": self.batch_size,
+                "flush_interval_seconds": self.flush_interval,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "flushes": self.flushes,
+                "failed_flushes": self.failed_flushes,
+                "last_flush_ms": self.last_flush_ms,
+                "avg_flush_ms": round(self._flush_ms_total / self.flushes, 2) if self.flushes else None
+            }
@@ -96,3 +96,75 @@ FINAL CHECK:
 RETURN ONLY THE JSON OBJECT.
 
 """
+
+
+# -------- SECTION REGENERATION --------
+# Rewrites one section of an existing campaign without resending MASTER_PROMPT
+
+SECTION_PROMPT = """
+You are BrandPulse, an autonomous Brand Strategist.
+
+Rewrite ONLY the "{section}" section of an existing brand campaign.
+
+RULES (STRICT):
+- Stay consistent with the brief and with the rest of the campaign given as context.
+- Produce a fresh take; do NOT repeat the current version of the section.
+- Follow the Platform and Content Type in the brief and the currency symbol in the budget.
+- Do NOT mention the word "AI". Do NOT include markdown, commentary or line breaks inside strings.
+- Arrays must not be empty. No placeholders. No additional keys.
+- {logic}
+
+OUTPUT FORMAT (MUST MATCH EXACTLY, RETURN ONLY THIS JSON OBJECT):
+{format}
+
+USER BRIEF:
+{brief}
+CAMPAIGN CONTEXT:
+{context}
+CURRENT {section}:
+{current}
+"""
+
+SECTION_FORMATS = {
+    "brand_description": '{"overview": "", "personality": [], "promise": ""}',
+    "strategy": '{"campaign_theme": "", "emotional_hook": "", "target_emotion": "", "content_angle": "", "strategy_summary": "", "why_it_works": []}',
+    "visual_identity": '{"color_palette": [], "mood": "", "image_prompt": ""}',
+    "copywriting": '{"captions": [], "ad_headline": ""}',
+    "media_plan": '{"platforms": [], "posting_schedule": "", "cta": ""}',
+    "campaign_timeline": '{"phases": [{"phase_name": "", "duration": "", "objective": "", "key_activities": []}]}',
+    "influencer_recommendations": '{"note": "Suggested creator profiles, not real individuals.", "phase_wise": [{"phase_name": "", "platform": "", "suggested_creator_handles": [], "creator_type": "", "rationale": ""}]}',
+}
+
+SECTION_LOGIC = {
+    "brand_description": "Brand description must align with product category and audience identity.",
+    "strategy": "Strategy summary must reflect how budget and duration shape execution.",
+    "visual_identity": "Visual identity must match brand energy and audience taste.",
+    "copywriting": "Captions and headline must carry the campaign theme and emotional hook.",
+    "media_plan": "Media plan must reflect where discovery vs conversion happens.",
+    "campaign_timeline": "Campaign timeline phases must scale with campaign duration.",
+    "influencer_recommendations": "Influencer recommendations must scale with budget and platform relevance, use creator handles or archetypes (not real individuals) and match the timeline phase names.",
+}
+
+# Whole-campaign output format, assembled from the section formats
+CAMPAIGN_FORMAT = "{" + ", ".join(f'"{name}": {fmt}' for name, fmt in SECTION_FORMATS.items()) + "}"
+
+
+# -------- JSON FIX-UP --------
+# Sent when a generation could not be parsed or validated even after local repair
+
+FIX_JSON_PROMPT = """
+The JSON below is malformed or does not match the required structure.
+
+Return the corrected JSON ONLY. Keep all existing content; complete anything
+that is cut off, add missing keys and remove extra keys so it matches the
+required structure exactly. No markdown, no commentary.
+
+ERROR:
+{error}
+
+REQUIRED STRUCTURE:
+{format}
+
+JSON TO FIX:
+{output}
+"""
@@ -0,0 +1,311 @@
+import contextlib
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling upstream while the breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures. While open every call
+    is rejected; after reset_timeout one probe call is let through
+    (half-open) and its outcome closes or re-opens the breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def release_probe(self):
+        """Settle a call whose outcome says nothing about the upstream, e.g. one the caller abandoned"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+                "retry_in_seconds": retry_in
+            }
+
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of recent calls so that retries cannot
+    multiply load on an upstream that is already failing.
+    """
+
+    def __init__(self, ratio: float, window_seconds: float = 60.0, min_retries: int = 3):
+        self.ratio = ratio
+        self.window_seconds = window_seconds
+        self.min_retries = min_retries
+        self._calls = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        for events in (self._calls, self._retries):
+            while events and now - events[0] > self.window_seconds:
+                events.popleft()
+
+    def record_call(self):
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            self._calls.append(now)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._calls):
+                return False
+            self._retries.append(now)
+            return True
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class LatencyTracker:
+    """
+    Rolling window of observed latencies. threshold() is the given percentile
+    of the window clamped to [min_seconds, max_seconds], or default_seconds
+    until min_samples observations have been made.
+    """
+
+    def __init__(self, percentile: float, default_seconds: float, min_seconds: float, max_seconds: float,
+                 window: int = 200, min_samples: int = 20):
+        self.percentile = percentile
+        self.default_seconds = default_seconds
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def _percentile(self, samples) -> float:
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(self.percentile / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def threshold(self) -> float:
+        with self._lock:
+            samples = list(self._samples)
+        if len(samples) < self.min_samples:
+            return self.default_seconds
+        return min(self.max_seconds, max(self.min_seconds, self._percentile(samples)))
+
+    def stats(self) -> dict:
+        with self._lock:
+            samples = list(self._samples)
+        return {
+            "samples": len(samples),
+            "percentile": self.percentile,
+            "observed_seconds": round(self._percentile(samples), 3) if samples else None,
+            "threshold_seconds": round(self.threshold(), 3)
+        }
+
+
+# Scheduling priority of upstream calls made from the current context; lower runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+_call_priority = contextvars.ContextVar("call_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextlib.contextmanager
+def call_priority(priority: int):
+    """Run upstream calls made inside the block at the given priority"""
+    token = _call_priority.set(priority)
+    try:
+        yield
+    finally:
+        _call_priority.reset(token)
+
+
+def current_priority() -> int:
+    return _call_priority.get()
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised instead of queueing a call that could not start in time"""
+
+
+class _Waiter:
+    __slots__ = ("granted", "cancelled")
+
+    def __init__(self):
+        self.granted = threading.Event()
+        self.cancelled = False
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit for an upstream, adjusted AIMD-style: each success
+    within latency_tolerance x the usual latency adds 1/limit (about +1 per
+    limit's worth of calls); an overload error (429 / quota) or a slow call
+    multiplies the limit by backoff, at most once per usual latency so a
+    burst of failures from one window counts once.
+
+    Calls over the limit wait in a bounded priority queue. A call is shed
+    with AdmissionRejected when the queue is full, or when its expected wait
+    plus the usual latency would run past its deadline.
+    """
+
+    def __init__(self, initial_limit: float, min_limit: float, max_limit: float, max_queue: int,
+                 backoff: float = 0.5, latency_tolerance: float = 2.0):
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.max_queue = max_queue
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+
+        self.in_flight = 0
+        self.usual_latency = None
+        self._last_decrease = 0.0
+        self._queue = []
+        self._waiting = 0
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self.counts = {"admitted": 0, "queued": 0, "shed_queue_full": 0, "shed_deadline": 0, "overloads": 0}
+
+    def _expected_wait(self) -> float:
+        # Queued calls ahead of us drain at roughly limit calls per usual latency
+        if self.usual_latency is None:
+            return 0.0
+        return (self._waiting + 1) / max(self.limit, 1.0) * self.usual_latency
+
+    def acquire(self, deadline: float, priority: int = PRIORITY_INTERACTIVE):
+        """Take a slot, waiting in the queue until deadline (a time.monotonic() value)"""
+        with self._lock:
+            if self.in_flight < int(self.limit) and not self._waiting:
+                self.in_flight += 1
+                self.counts["admitted"] += 1
+                return
+            if self._waiting >= self.max_queue:
+                self.counts["shed_queue_full"] += 1
+                raise AdmissionRejected(f"Upstream queue is full ({self.max_queue} waiting)")
+            remaining = deadline - time.monotonic()
+            if self._expected_wait() + (self.usual_latency or 0.0) > remaining:
+                self.counts["shed_deadline"] += 1
+                raise AdmissionRejected("Upstream call would not finish before its deadline")
+            waiter = _Waiter()
+            heapq.heappush(self._queue, (priority, next(self._order), waiter))
+            self._waiting += 1
+            self.counts["queued"] += 1
+
+        if waiter.granted.wait(max(0.0, deadline - time.monotonic())):
+            return
+        with self._lock:
+            if waiter.granted.is_set():
+                return
+            waiter.cancelled = True
+            self._waiting -= 1
+            self.counts["shed_deadline"] += 1
+        raise AdmissionRejected("Deadline passed while waiting for an upstream slot")
+
+    def release(self, latency: float = None, overloaded: bool = False):
+        """Free a slot. latency is the call's duration when it succeeded or timed out."""
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight -= 1
+            if overloaded:
+                self.counts["overloads"] += 1
+                self._decrease(now)
+            elif latency is not None:
+                if self.usual_latency is None:
+                    self.usual_latency = latency
+                if latency > self.latency_tolerance * self.usual_latency:
+                    self._decrease(now)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                self.usual_latency += 0.05 * (latency - self.usual_latency)
+            self._grant()
+
+    def _decrease(self, now: float):
+        if now - self._last_decrease >= (self.usual_latency or 1.0):
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            self._last_decrease = now
+
+    def _grant(self):
+        while self._queue and self.in_flight < int(self.limit):
+            _, _, waiter = heapq.heappop(self._queue)
+            if waiter.cancelled:
+                continue
+            self._waiting -= 1
+            self.in_flight += 1
+            self.counts["admitted"] += 1
+            waiter.granted.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "queue_depth": self._waiting,
+                "max_queue": self.max_queue,
+                "usual_latency_seconds": round(self.usual_latency, 3) if self.usual_latency is not None else None,
+                **self.counts
+            }
@@ -78,3 +78,15 @@ class CampaignOutput(BaseModel):
     media_plan: MediaPlan
     campaign_timeline: CampaignTimeline
     influencer_recommendations: InfluencerRecommendations
+
+
+# Schema of each top-level section, for validating sections on their own
+SECTION_SCHEMAS = {
+    "brand_description": BrandDescription,
+    "strategy": Strategy,
+    "visual_identity": VisualIdentity,
+    "copywriting": Copywriting,
+    "media_plan": MediaPlan,
+    "campaign_timeline": CampaignTimeline,
+    "influencer_recommendations": InfluencerRecommendations,
+}
@@ -0,0 +1,251 @@
+"""
+Near-duplicate brief lookup for the response cache.
+
+Briefs are reduced to word shingles of their free-text fields and hashed
+into MinHash signatures; LSH banding finds earlier briefs whose estimated
+Jaccard similarity clears a threshold. Only briefs with the same product,
+platform, content type and budget band (and prompt version) are compared,
+so a campaign is never reused for another brand's product. The index
+holds response cache keys, not campaigns, and is kept in SQLite so it
+survives restarts.
+"""
+
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from backend.cache import PROMPT_VERSION, response_cache
+from backend.config import (
+    SIMILARITY_CACHE_ENABLED,
+    SIMILARITY_CACHE_MAX_ENTRIES,
+    SIMILARITY_CACHE_PATH,
+    SIMILARITY_CACHE_THRESHOLD,
+)
+
+# Free-text brief fields compared for similarity, and fields whose words must match exactly
+SIMILAR_FIELDS = ("target audience", "goal", "tone", "campaign duration")
+EXACT_FIELDS = ("product", "platform", "content type")
+
+# Budget midpoints (USD) separating the bands a reused campaign must share
+BUDGET_BANDS = (1000, 5000, 20000, 100000)
+
+NUM_PERM = 64
+BAND_ROWS = 4  # 16 bands of 4 rows: briefs above ~0.5 similarity usually share a band
+MERSENNE_PRIME = (1 << 61) - 1
+
+_rng = random.Random(1729)  # Fixed so signatures stay comparable across restarts
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+STOPWORDS = {"a", "an", "and", "the", "of", "for", "to", "in", "on", "with", "our", "my", "your", "who", "that"}
+
+
+def brief_fields(user_brief: str) -> dict:
+    """'Field: value' lines of a brief, keyed by lowercased field name"""
+    fields = {}
+    for line in user_brief.splitlines():
+        name, sep, value = line.partition(":")
+        if sep:
+            fields[name.strip().lower()] = value.strip()
+    return fields
+
+
+def words(text: str) -> list:
+    return [word for word in re.sub(r"[^a-z0-9]+", " ", text.lower()).split() if word not in STOPWORDS]
+
+
+def shingles(fields: dict) -> set:
+    """Per-field words and word pairs, so 'gen-z gamers' and 'Gen Z gamers in India' overlap"""
+    result = set()
+    for name in SIMILAR_FIELDS:
+        tokens = words(fields.get(name, ""))
+        result.update(f"{name}:{token}" for token in tokens)
+        result.update(f"{name}:{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return result
+
+
+def budget_band(budget: str) -> str:
+    amounts = []
+    for number, suffix in re.findall(r"(\d[\d,]*(?:\.\d+)?)\s*([kKmM]?)", budget or ""):
+        amount = float(number.replace(",", ""))
+        amounts.append(amount * {"k": 1e3, "m": 1e6}.get(suffix.lower(), 1))
+    if not amounts:
+        return " ".join(words(budget or "")) or "unknown"
+    midpoint = (min(amounts) + max(amounts)) / 2
+    return str(sum(midpoint >= bound for bound in BUDGET_BANDS))
+
+
+def partition_of(fields: dict) -> str:
+    # Word order and case don't matter: "Running Shoes, Nike" is "nike running shoes"
+    exact = [" ".join(sorted(set(words(fields.get(name, ""))))) for name in EXACT_FIELDS]
+    return "|".join([PROMPT_VERSION, *exact, budget_band(fields.get("budget", ""))])
+
+
+def minhash(tokens: set) -> tuple:
+    hashes = [
+        int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+        for token in tokens
+    ]
+    if not hashes:
+        return (MERSENNE_PRIME,) * NUM_PERM
+    return tuple(min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in PERMUTATIONS)
+
+
+def similarity(first: tuple, second: tuple) -> float:
+    """Estimated Jaccard similarity of the token sets behind two signatures"""
+    return sum(x == y for x, y in zip(first, second)) / NUM_PERM
+
+
+def band_keys(partition: str, signature: tuple) -> list:
+    return [
+        (partition, i, signature[i * BAND_ROWS:(i + 1) * BAND_ROWS])
+        for i in range(NUM_PERM // BAND_ROWS)
+    ]
+
+
+class SimilarityIndex:
+    """
+    MinHash/LSH index from briefs to response cache keys. At most
+    max_entries briefs are kept, least recently used first out.
+    """
+
+    def __init__(self, path: str, threshold: float, max_entries: int):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (partition, signature)
+        self._bands = {}  # band key -> set of keys
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS briefs ("
+            " key TEXT PRIMARY KEY,"
+            " partition TEXT NOT NULL,"
+            " signature BLOB NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._load()
+
+    def _load(self):
+        rows = self._conn.execute(
+            "SELECT key, partition, signature FROM briefs ORDER BY accessed_at DESC LIMIT ?", (self.max_entries,)
+        ).fetchall()
+        for key, partition, blob in reversed(rows):
+            self._insert(key, partition, struct.unpack(f"<{NUM_PERM}Q", blob))
+        # Rows past the bound were evicted while the index was offline
+        self._conn.execute(
+            "DELETE FROM briefs WHERE key NOT IN (SELECT key FROM briefs ORDER BY accessed_at DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+        self._conn.commit()
+
+    def _insert(self, key: str, partition: str, signature: tuple):
+        self._entries[key] = (partition, signature)
+        for band in band_keys(partition, signature):
+            self._bands.setdefault(band, set()).add(key)
+
+    def _remove(self, key: str):
+        partition, signature = self._entries.pop(key)
+        for band in band_keys(partition, signature):
+            members = self._bands.get(band)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._bands[band]
+
+    def add(self, key: str, user_brief: str):
+        """Index a brief whose campaign is stored in the response cache under key"""
+        fields = brief_fields(user_brief)
+        partition, signature = partition_of(fields), minhash(shingles(fields))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._insert(key, partition, signature)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                evicted.append((oldest,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO briefs (key, partition, signature, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, partition, struct.pack(f"<{NUM_PERM}Q", *signature), time.time())
+            )
+            self._conn.executemany("DELETE FROM briefs WHERE key = ?", evicted)
+            self._conn.commit()
+
+    def find(self, user_brief: str):
+        """
+        (key, similarity) of the most similar indexed brief above the threshold,
+        or None. The caller reports whether key's campaign was still there with
+        record_hit or record_miss.
+        """
+        fields = brief_fields(user_brief)
+        partition, signature = partition_of(fields), minhash(shingles(fields))
+        with self._lock:
+            candidates = set()
+            for band in band_keys(partition, signature):
+                candidates.update(self._bands.get(band, ()))
+            best = max(
+                ((key, similarity(signature, self._entries[key][1])) for key in candidates),
+                key=lambda match: match[1],
+                default=None
+            )
+            if best is None or best[1] < self.threshold:
+                return None
+            return best
+
+    def record_hit(self, key: str):
+        """A found key's campaign was served; it becomes the most recently used"""
+        with self._lock:
+            self.hits += 1
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._conn.execute("UPDATE briefs SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def discard(self, key: str):
+        """Drop a key whose campaign is no longer in the response cache"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._conn.execute("DELETE FROM briefs WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+similarity_index = None
+
+# Campaigns themselves live in the response cache, so the index needs it
+if SIMILARITY_CACHE_ENABLED and response_cache is not None:
+    try:
+        similarity_index = SimilarityIndex(SIMILARITY_CACHE_PATH, SIMILARITY_CACHE_THRESHOLD, SIMILARITY_CACHE_MAX_ENTRIES)
+    except Exception as e:
+        print(f"⚠️  Similarity cache disabled: {e}")
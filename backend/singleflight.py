@@ -0,0 +1,73 @@
+import copy
+import math
+import threading
+
+from backend.deadline import RequestDeadlineExceeded, remaining
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+    The first caller runs fn; callers arriving while it is in flight wait
+    and share its result (or its exception). Every caller gets its own
+    deep copy, so callers can mutate what they receive. A waiting caller
+    gives up at its own request deadline, and runs fn itself if the leader
+    only failed because the leader's deadline ran out.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn):
+        return self.run(key, fn)[0]
+
+    def run(self, key: str, fn):
+        """(result, leader): leader is False for callers that shared another caller's execution"""
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                    self.executions += 1
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                try:
+                    call.result = fn()
+                except Exception as e:
+                    call.error = e
+                finally:
+                    with self._lock:
+                        del self._calls[key]
+                    call.done.set()
+            else:
+                left = remaining()
+                if not call.done.wait(left if math.isfinite(left) else None):
+                    raise RequestDeadlineExceeded("Request deadline passed waiting on a coalesced call")
+                if isinstance(call.error, RequestDeadlineExceeded):
+                    # The leader's request ran out of time, not necessarily this one's
+                    continue
+
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result), leader
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executions": self.executions,
+                "coalesced": self.coalesced
+            }
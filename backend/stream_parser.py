@@ -0,0 +1,95 @@
+import json
+
+
+class SectionStreamParser:
+    """
+    Incremental parser for a streamed top-level JSON object.
+
+    feed() accepts text chunks as they arrive and returns the
+    (key, value) pairs of every top-level member whose value has been
+    completely received since the last call. Text before the opening
+    brace (e.g. a markdown fence) is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.state = "start"
+        self.key_start = None
+        self.key = None
+        self.value_start = None
+        self.value_kind = None
+        self.done = False
+
+    def feed(self, chunk: str) -> list:
+        self.buffer += chunk
+        completed = []
+
+        while self.pos < len(self.buffer) and not self.done:
+            c = self.buffer[self.pos]
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == "\\":
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.state == "key":
+                        self.key = json.loads(self.buffer[self.key_start:self.pos + 1])
+                        self.state = "colon"
+                    elif self.depth == 1 and self.state == "value" and self.value_kind == "string":
+                        completed.append(self._complete(self.pos + 1))
+
+            elif self.depth == 0:
+                if c == "{":
+                    self.depth = 1
+                    self.state = "key"
+
+            elif c == '"':
+                self.in_string = True
+                if self.depth == 1 and self.state == "key":
+                    self.key_start = self.pos
+                elif self.depth == 1 and self.state == "value_start":
+                    self._start_value("string")
+
+            elif c in "{[":
+                if self.depth == 1 and self.state == "value_start":
+                    self._start_value("container")
+                self.depth += 1
+
+            elif c in "}]":
+                self.depth -= 1
+                if self.depth == 1 and self.state == "value" and self.value_kind == "container":
+                    completed.append(self._complete(self.pos + 1))
+                elif self.depth == 0:
+                    if self.state == "value" and self.value_kind == "primitive":
+                        completed.append(self._complete(self.pos))
+                    self.done = True
+
+            elif self.depth == 1:
+                if c == ":" and self.state == "colon":
+                    self.state = "value_start"
+                elif c == ",":
+                    if self.state == "value" and self.value_kind == "primitive":
+                        completed.append(self._complete(self.pos))
+                    self.state = "key"
+                elif not c.isspace() and self.state == "value_start":
+                    self._start_value("primitive")
+
+            self.pos += 1
+
+        return completed
+
+    def _start_value(self, kind: str):
+        self.value_start = self.pos
+        self.value_kind = kind
+        self.state = "value"
+
+    def _complete(self, end: int):
+        raw = self.buffer[self.value_start:end].strip()
+        self.state = "comma"
+        return self.key, json.loads(raw)
@@ -0,0 +1,172 @@
+"""
+Token, cost and latency accounting for Gemini generations.
+
+Each call is recorded against its endpoint, operation (campaign, section,
+json_fix, ...), industry, platform and model. Token counts come from the
+response's usage metadata, or a ~4 characters per token estimate when the
+response has none.
+"""
+
+import threading
+from contextvars import ContextVar
+
+from backend.config import GEMINI_PRICE_INPUT_PER_MTOK, GEMINI_PRICE_OUTPUT_PER_MTOK
+from metrics import Counter, Histogram, register
+
+# Set per request by the API server; calls made outside a request count as "other"
+current_endpoint = ContextVar("usage_endpoint", default="other")
+
+# Label values are user input; past this many distinct values per label they count as "other"
+MAX_LABEL_VALUES = 50
+LABEL_NAMES = ("endpoint", "operation", "industry", "platform", "model")
+
+GEMINI_CALLS = register(Counter(
+    "brandpulse_gemini_calls_total", "Gemini generations and cache hits", LABEL_NAMES + ("source",)
+))
+GEMINI_TOKENS = register(Counter(
+    "brandpulse_gemini_tokens_total",
+    "Gemini tokens by kind (prompt, response, and the fixed prompt template's share of prompt)",
+    LABEL_NAMES + ("kind",)
+))
+GEMINI_COST = register(Counter(
+    "brandpulse_gemini_cost_usd_total", "Estimated Gemini spend in USD", LABEL_NAMES
+))
+GEMINI_SECONDS = register(Histogram(
+    "brandpulse_gemini_generation_seconds", "Latency of successful Gemini generations", ("operation", "model")
+))
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4 if text else 0
+
+
+def usage_counts(usage_metadata):
+    """(prompt_tokens, response_tokens) from a response's usage metadata, None when absent"""
+    if usage_metadata is None:
+        return None
+    prompt = getattr(usage_metadata, "prompt_token_count", 0) or 0
+    response = getattr(usage_metadata, "candidates_token_count", 0) or 0
+    if not prompt and not response:
+        return None
+    return prompt, response
+
+
+class UsageStore:
+    """In-process totals per (endpoint, operation, industry, platform, model)"""
+
+    def __init__(self, input_price_per_mtok: float, output_price_per_mtok: float):
+        self.input_price_per_mtok = input_price_per_mtok
+        self.output_price_per_mtok = output_price_per_mtok
+        self._rows = {}
+        self._seen = {name: set() for name in LABEL_NAMES}
+        self._lock = threading.Lock()
+
+    def _label(self, name: str, value) -> str:
+        value = str(value or "unknown").strip().lower()[:60] or "unknown"
+        seen = self._seen[name]
+        if value not in seen:
+            if len(seen) >= MAX_LABEL_VALUES:
+                return "other"
+            seen.add(value)
+        return value
+
+    def _row(self, usage: dict, model: str) -> tuple:
+        key = tuple(self._label(name, value) for name, value in (
+            ("endpoint", current_endpoint.get()),
+            ("operation", usage.get("operation")),
+            ("industry", usage.get("industry")),
+            ("platform", usage.get("platform")),
+            ("model", model),
+        ))
+        if key not in self._rows:
+            self._rows[key] = {
+                "calls": 0, "estimated_calls": 0, "cache_hits": 0,
+                "prompt_tokens": 0, "response_tokens": 0, "template_tokens": 0,
+                "latency_seconds": 0.0, "cost_usd": 0.0
+            }
+        return key
+
+    def cost(self, prompt_tokens: int, response_tokens: int) -> float:
+        return (prompt_tokens * self.input_price_per_mtok + response_tokens * self.output_price_per_mtok) / 1_000_000
+
+    def record(self, usage: dict, model: str, prompt: str, response_text: str, usage_metadata, latency: float):
+        """One successful generation. usage carries operation, industry, platform and template_tokens."""
+        usage = usage or {}
+        counts = usage_counts(usage_metadata)
+        estimated = counts is None
+        if estimated:
+            counts = estimate_tokens(prompt), estimate_tokens(response_text)
+        prompt_tokens, response_tokens = counts
+        template_tokens = min(usage.get("template_tokens", 0), prompt_tokens)
+        cost = self.cost(prompt_tokens, response_tokens)
+
+        with self._lock:
+            key = self._row(usage, model)
+            row = self._rows[key]
+            row["calls"] += 1
+            row["estimated_calls"] += estimated
+            row["prompt_tokens"] += prompt_tokens
+            row["response_tokens"] += response_tokens
+            row["template_tokens"] += template_tokens
+            row["latency_seconds"] += latency
+            row["cost_usd"] += cost
+
+        GEMINI_CALLS.inc(*key, "gemini")
+        GEMINI_TOKENS.inc(*key, "prompt", amount=prompt_tokens)
+        GEMINI_TOKENS.inc(*key, "response", amount=response_tokens)
+        GEMINI_TOKENS.inc(*key, "template", amount=template_tokens)
+        GEMINI_COST.inc(*key, amount=cost)
+        GEMINI_SECONDS.observe(latency, key[1], key[4])
+
+    def record_cache_hit(self, usage: dict):
+        """A generation answered from the response cache instead of Gemini"""
+        with self._lock:
+            key = self._row(usage or {}, "cache")
+            self._rows[key]["cache_hits"] += 1
+        GEMINI_CALLS.inc(*key, "cache")
+
+    def summary(self, group_by=LABEL_NAMES) -> dict:
+        """Totals, plus per-value totals for each label in group_by"""
+        unknown = [name for name in group_by if name not in LABEL_NAMES]
+        if unknown:
+            raise ValueError(f"Cannot group by {', '.join(unknown)}; expected any of: {', '.join(LABEL_NAMES)}")
+        with self._lock:
+            rows = [(dict(zip(LABEL_NAMES, key)), dict(row)) for key, row in self._rows.items()]
+
+        result = {
+            "prices_per_million_tokens": {"input": self.input_price_per_mtok, "output": self.output_price_per_mtok},
+            "totals": summarize(row for _, row in rows)
+        }
+        for name in group_by:
+            groups = {}
+            for labels, row in rows:
+                groups.setdefault(labels[name], []).append(row)
+            result["by_" + name] = {value: summarize(group) for value, group in sorted(groups.items())}
+        return result
+
+
+def summarize(rows) -> dict:
+    totals = {
+        "calls": 0, "estimated_calls": 0, "cache_hits": 0,
+        "prompt_tokens": 0, "response_tokens": 0, "template_tokens": 0,
+        "latency_seconds": 0.0, "cost_usd": 0.0
+    }
+    for row in rows:
+        for name, value in row.items():
+            totals[name] += value
+    calls = totals["calls"]
+    totals["cost_usd"] = round(totals["cost_usd"], 6)
+    totals["avg_prompt_tokens"] = round(totals["prompt_tokens"] / calls, 1) if calls else 0
+    totals["avg_response_tokens"] = round(totals["response_tokens"] / calls, 1) if calls else 0
+    latency = totals.pop("latency_seconds")
+    if calls:
+        # Cache-only groups have no Gemini latency to report, not a latency of zero
+        totals["avg_latency_seconds"] = round(latency / calls, 3)
+    totals["template_share"] = round(totals["template_tokens"] / totals["prompt_tokens"], 3) \
+        if totals["prompt_tokens"] else 0
+    total_requests = calls + totals["cache_hits"]
+    totals["cache_hit_rate"] = round(totals["cache_hits"] / total_requests, 3) if total_requests else 0
+    return totals
+
+
+usage_store = UsageStore(GEMINI_PRICE_INPUT_PER_MTOK, GEMINI_PRICE_OUTPUT_PER_MTOK)
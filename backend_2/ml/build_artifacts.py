@@ -0,0 +1,48 @@
+"""
+Models are not checked in: train any that are missing, then bring the
+flattened exports and the prediction cube up to date with them.
+
+Run it at build time (render.yaml buildCommand) so a deploy starts with
+everything in place; the server's warmup thread calls build_artifacts() too
+and only does work when something is missing or stale.
+"""
+import os
+import subprocess
+import sys
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, single worker only
+    fcntl = None
+
+# Get script directory for relative paths
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+TRAINING_SCRIPTS = {
+    "campaign_predictor.pkl": "train_model.py",
+    "reach_predictor.pkl": "train_reach_model.py",
+}
+
+
+def build_artifacts():
+    """Train missing models, refresh the exports and the cube. Holds a file lock so workers build once."""
+    models_dir = os.path.join(script_dir, "models")
+    os.makedirs(models_dir, exist_ok=True)
+    with open(os.path.join(models_dir, ".build.lock"), "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        for filename, script in TRAINING_SCRIPTS.items():
+            if not os.path.exists(os.path.join(models_dir, filename)):
+                print(f"🧠 {filename} not found, running {script}...")
+                subprocess.run([sys.executable, script], cwd=script_dir, check=True)
+
+        from export_forest import ensure_flat_exports
+        for name in ensure_flat_exports():
+            print(f"✓ Exported {name}")
+        from build_prediction_cube import ensure_cube
+        if ensure_cube():
+            print("✓ Built the prediction cube")
+
+
+if __name__ == "__main__":
+    build_artifacts()
@@ -0,0 +1,107 @@
+import itertools
+import json
+import math
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from forest_runtime import model_fingerprint
+from prediction_cube import NUMERIC_AXES, TARGETS, PredictionCube, cube_dir
+
+# Get script directory for relative paths
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def split_thresholds(pipeline, feature: str) -> np.ndarray:
+    """All thresholds the forest uses to split on one raw numeric feature"""
+    names = list(pipeline.named_steps["preprocessor"].get_feature_names_out())
+    column = names.index(f"num__{feature}")
+    forest = pipeline.named_steps["model"]
+    return np.concatenate([
+        tree.tree_.threshold[tree.tree_.feature == column] for tree in forest.estimators_
+    ])
+
+
+def numeric_range(pipelines, feature: str) -> list:
+    """
+    Integer range [lo, hi] such that clipping any integer into it never
+    changes which side of a split it falls on.
+    """
+    thresholds = np.concatenate([split_thresholds(p, feature) for p in pipelines])
+    if len(thresholds) == 0:
+        return [0, 0]
+    return [int(math.floor(thresholds.min())), int(math.floor(thresholds.max())) + 1]
+
+
+def build_cube():
+    pipelines = {
+        target: joblib.load(os.path.join(script_dir, "models", filename))
+        for target, filename in TARGETS.items()
+    }
+
+    # Only platform/content_type pairs seen in training are worth precomputing
+    data = pd.read_csv(os.path.join(script_dir, "..", "data", "campaign_performance_data.csv"))
+    pairs = sorted(set(zip(data["platform"], data["content_type"])))
+    industries = sorted(data["industry"].unique())
+
+    ranges = {name: numeric_range(pipelines.values(), name) for name in NUMERIC_AXES}
+    axes = [range(lo, hi + 1) for lo, hi in (ranges[name] for name in NUMERIC_AXES)]
+    numeric_grid = np.array(list(itertools.product(*axes)))
+
+    shape = (len(pairs), len(industries)) + tuple(len(axis) for axis in axes)
+    values = {target: np.empty(shape, dtype=np.float64) for target in TARGETS}
+    print(f"Evaluating {np.prod(shape):,} grid cells {shape}")
+
+    # One (platform, content_type) slab at a time keeps the frames small
+    for p, (platform, content_type) in enumerate(pairs):
+        frame = pd.DataFrame(
+            [(industry,) + tuple(point) for industry in industries for point in numeric_grid],
+            columns=["industry"] + NUMERIC_AXES
+        )
+        frame.insert(0, "content_type", content_type)
+        frame.insert(0, "platform", platform)
+        for target, pipeline in pipelines.items():
+            values[target][p] = pipeline.predict(frame).reshape(shape[1:])
+        print(f"  {platform} / {content_type} done")
+
+    os.makedirs(cube_dir, exist_ok=True)
+    for target, array in values.items():
+        np.save(os.path.join(cube_dir, f"{target}.npy"), array)
+
+    index = {
+        "pairs": [list(pair) for pair in pairs],
+        "industries": industries,
+        "numeric": ranges,
+        "models": {
+            target: model_fingerprint(os.path.join(script_dir, "models", filename))
+            for target, filename in TARGETS.items()
+        },
+    }
+    with open(os.path.join(cube_dir, "index.json"), "w") as f:
+        json.dump(index, f, indent=2)
+
+    size_mb = sum(array.nbytes for array in values.values()) / 1e6
+    print(f"Prediction cube saved to {cube_dir} ({size_mb:.1f} MB)")
+
+    # Spot-check against the forests on real training rows
+    cube = PredictionCube(cube_dir)
+    sample = data.drop(["reach", "engagement"], axis=1).sample(2000, random_state=42)
+    for target, pipeline in pipelines.items():
+        looked_up, missing = cube.lookup_many(target, sample.to_dict("records"))
+        expected = pipeline.predict(sample)
+        max_error = np.nanmax(np.abs(looked_up - expected))
+        print(f"  {target}: max abs difference {max_error:.6f} ({len(missing)} rows out of grid)")
+
+
+def ensure_cube() -> bool:
+    """Builds the cube when it is missing or older than the models; True if it was rebuilt"""
+    if os.path.exists(os.path.join(cube_dir, "index.json")) and PredictionCube(cube_dir).is_current():
+        return False
+    build_cube()
+    return True
+
+
+if __name__ == "__main__":
+    build_cube()
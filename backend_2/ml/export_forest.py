@@ -0,0 +1,156 @@
+import json
+import os
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import OneHotEncoder
+
+from forest_runtime import ARRAYS, FlatForest, model_fingerprint
+
+# Get script directory for relative paths
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+MODELS = ["campaign_predictor", "reach_predictor"]
+
+
+def flat_dir_for(name: str) -> str:
+    return os.path.join(script_dir, "models", f"{name}_flat")
+
+
+def export_pipeline(pipeline, directory: str, source: dict = None):
+    """Flattens a fitted ColumnTransformer + RandomForestRegressor pipeline into .npy arrays"""
+    preprocessor = pipeline.named_steps["preprocessor"]
+    forest = pipeline.named_steps["model"]
+    if not isinstance(preprocessor, ColumnTransformer) or not isinstance(forest, RandomForestRegressor):
+        raise ValueError("Expected a ColumnTransformer + RandomForestRegressor pipeline")
+
+    if preprocessor.remainder != "drop":
+        raise ValueError("Only remainder='drop' can be flattened")
+
+    categorical, numeric = [], []
+    # Fitted transformers replace "passthrough", so check the declared spec for it
+    declared = {name: transformer for name, transformer, _ in preprocessor.transformers}
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == "remainder":
+            continue
+        if isinstance(transformer, OneHotEncoder):
+            if transformer.handle_unknown != "ignore":
+                raise ValueError("Only OneHotEncoder(handle_unknown='ignore') can be flattened")
+            categorical += [
+                {"name": column, "categories": [str(c) for c in categories]}
+                for column, categories in zip(columns, transformer.categories_)
+            ]
+        elif isinstance(declared[name], str) and declared[name] == "passthrough":
+            numeric += list(columns)
+        else:
+            raise ValueError(f"Unsupported transformer: {transformer!r}")
+
+    trees = [estimator.tree_ for estimator in forest.estimators_]
+    max_nodes = max(tree.node_count for tree in trees)
+    shape = (len(trees), max_nodes)
+
+    arrays = {
+        "feature": np.zeros(shape, dtype=np.int64),
+        "threshold": np.zeros(shape, dtype=np.float64),
+        "children": np.zeros(shape + (2,), dtype=np.int64),
+        "value": np.zeros(shape, dtype=np.float64),
+    }
+    for t, tree in enumerate(trees):
+        n = tree.node_count
+        nodes = np.arange(n)
+        is_leaf = tree.children_left == -1
+        arrays["feature"][t, :n] = np.where(is_leaf, 0, tree.feature)
+        arrays["threshold"][t, :n] = tree.threshold
+        # Leaves loop back to themselves so traversal can run a fixed number of steps
+        base = t * max_nodes
+        arrays["children"][t, :n, 0] = base + np.where(is_leaf, nodes, tree.children_left)
+        arrays["children"][t, :n, 1] = base + np.where(is_leaf, nodes, tree.children_right)
+        # Padding nodes are never reached but stay valid indices
+        arrays["children"][t, n:] = base
+        arrays["value"][t, :n] = tree.value[:, 0, 0]
+
+    os.makedirs(directory, exist_ok=True)
+    for name in ARRAYS:
+        np.save(os.path.join(directory, f"{name}.npy"), arrays[name])
+
+    meta = {
+        "categorical": categorical,
+        "numeric": numeric,
+        "n_features": sum(len(spec["categories"]) for spec in categorical) + len(numeric),
+        "max_depth": max(tree.max_depth for tree in trees),
+        "n_trees": len(trees),
+        "source": source,
+    }
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    size_mb = sum(array.nbytes for array in arrays.values()) / 1e6
+    print(f"Exported {len(trees)} trees to {directory} ({size_mb:.1f} MB)")
+
+
+def verify_export(pipeline, directory: str, data: pd.DataFrame) -> float:
+    """Max absolute difference between the flattened forest and the pipeline"""
+    flat = FlatForest(directory)
+    expected = pipeline.predict(data)
+    actual = flat.predict(data.to_dict("records"))
+    return float(np.max(np.abs(expected - actual)))
+
+
+def verify_sklearn_free() -> bool:
+    """Serves a prediction in a fresh interpreter and checks sklearn/pandas were never imported"""
+    check = (
+        "import sys\n"
+        "from predictor import predict_campaign_performance\n"
+        "from reach_predictor import predict_reach\n"
+        "row = {'platform': 'TikTok', 'content_type': 'Reel', 'industry': 'Fitness',"
+        " 'posting_hour': 20, 'caption_length': 120, 'cta': 1, 'influencer': 1}\n"
+        "predict_campaign_performance(row)\n"
+        "predict_reach(row)\n"
+        "sys.exit(1 if {'sklearn', 'pandas'} & set(sys.modules) else 0)\n"
+    )
+    env = dict(os.environ, ML_RUNTIME="flat")
+    return subprocess.run([sys.executable, "-c", check], cwd=script_dir, env=env).returncode == 0
+
+
+def ensure_flat_exports() -> list:
+    """Exports every model whose flattened copy is missing or older than its pickle"""
+    exported = []
+    for name in MODELS:
+        pickle_path = os.path.join(script_dir, "models", f"{name}.pkl")
+        meta_path = os.path.join(flat_dir_for(name), "meta.json")
+        if not os.path.exists(pickle_path):
+            continue
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                if json.load(f).get("source") == model_fingerprint(pickle_path):
+                    continue
+        export_pipeline(joblib.load(pickle_path), flat_dir_for(name), source=model_fingerprint(pickle_path))
+        exported.append(name)
+    return exported
+
+
+if __name__ == "__main__":
+    data = pd.read_csv(os.path.join(script_dir, "..", "data", "campaign_performance_data.csv"))
+    features = data.drop(["reach", "engagement"], axis=1)
+
+    ok = True
+    for name in MODELS:
+        pickle_path = os.path.join(script_dir, "models", f"{name}.pkl")
+        pipeline = joblib.load(pickle_path)
+        export_pipeline(pipeline, flat_dir_for(name), source=model_fingerprint(pickle_path))
+
+        max_error = verify_export(pipeline, flat_dir_for(name), features)
+        matches = max_error < 1e-6
+        ok = ok and matches
+        print(f"  {name}: max abs difference vs pipeline {max_error:.2e} {'✓' if matches else '✗'}")
+
+    sklearn_free = verify_sklearn_free()
+    ok = ok and sklearn_free
+    print(f"  Served without importing sklearn/pandas: {'✓' if sklearn_free else '✗'}")
+
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+# "auto" serves the flattened export when present, "flat" requires it,
+# "sklearn" always unpickles the full pipeline
+ML_RUNTIME = os.getenv("ML_RUNTIME", "auto")
+
+# ML_MMAP=1 maps the exported arrays read-only instead of copying them into
+# the process, so every worker on the host shares one physical copy
+MMAP_MODE = "r" if os.getenv("ML_MMAP", "0") == "1" else None
+
+# Rows traversed per vectorized step; bounds the (trees x rows) work arrays
+CHUNK_SIZE = 2048
+
+ARRAYS = ["feature", "threshold", "children", "value"]
+
+
+def model_fingerprint(path: str) -> dict:
+    """Size and SHA-256 of a pickle; unlike mtimes, survives copies and checkouts"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {"size": os.path.getsize(path), "sha256": digest.hexdigest()}
+
+
+class FlatForest:
+    """
+    A fitted OneHotEncoder/passthrough ColumnTransformer + RandomForestRegressor
+    flattened into plain NumPy arrays. Needs neither scikit-learn nor pandas.
+
+    Nodes of all trees share one index space (tree * max_nodes + node).
+    children[node] holds the global (left, right) pair, and leaves point to
+    themselves, so every tree can be stepped max_depth times in lockstep.
+    """
+
+    def __init__(self, directory: str, mmap_mode=None):
+        with open(os.path.join(directory, "meta.json")) as f:
+            self.meta = json.load(f)
+
+        for name in ARRAYS:
+            setattr(self, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode))
+
+        self.n_trees, self.max_nodes = self.feature.shape
+        self.max_depth = self.meta["max_depth"]
+        self.n_features = self.meta["n_features"]
+        self.roots = (np.arange(self.n_trees, dtype=np.int64) * self.max_nodes)[:, None]
+
+        self.columns = []
+        offset = 0
+        for spec in self.meta["categorical"]:
+            lookup = {category: offset + i for i, category in enumerate(spec["categories"])}
+            self.columns.append((spec["name"], lookup))
+            offset += len(spec["categories"])
+        self.numeric = [(name, offset + i) for i, name in enumerate(self.meta["numeric"])]
+
+    def encode(self, rows: list) -> np.ndarray:
+        """One-hot + passthrough encoding; unknown categories encode as all zeros"""
+        X = np.zeros((len(rows), self.n_features), dtype=np.float32)
+        for r, row in enumerate(rows):
+            for name, lookup in self.columns:
+                column = lookup.get(row[name])
+                if column is not None:
+                    X[r, column] = 1.0
+            for name, column in self.numeric:
+                X[r, column] = row[name]
+        return X
+
+    def predict(self, rows: list) -> np.ndarray:
+        X = self.encode(rows)
+        return np.concatenate([
+            self.predict_encoded(X[start:start + CHUNK_SIZE])
+            for start in range(0, max(len(X), 1), CHUNK_SIZE)
+        ])[:len(rows)]
+
+    def predict_encoded(self, X: np.ndarray) -> np.ndarray:
+        """Traverses every tree for every row at once and averages the leaves"""
+        n_rows, n_features = X.shape
+        if n_rows == 0:
+            return np.empty(0)
+
+        feature = self.feature.reshape(-1)
+        threshold = self.threshold.reshape(-1)
+        children = self.children.reshape(-1)
+        value = self.value.reshape(-1)
+
+        X_flat = X.reshape(-1)
+        row_offsets = (np.arange(n_rows, dtype=np.int64) * n_features)[None, :]
+        nodes = np.repeat(self.roots, n_rows, axis=1)
+        for _ in range(self.max_depth):
+            x = np.take(X_flat, row_offsets + np.take(feature, nodes))
+            go_right = ~(x <= np.take(threshold, nodes))
+            nodes = np.take(children, nodes * 2 + go_right)
+
+        return np.take(value, nodes).mean(axis=0)
+
+
+def load_model(pickle_path: str, flat_dir: str, mmap_mode=MMAP_MODE):
+    """Loads a FlatForest or the sklearn Pipeline according to ML_RUNTIME"""
+    if ML_RUNTIME != "sklearn" and os.path.exists(os.path.join(flat_dir, "meta.json")):
+        flat = FlatForest(flat_dir, mmap_mode=mmap_mode)
+        if ML_RUNTIME == "flat" or not os.path.exists(pickle_path):
+            return flat
+        if flat.meta.get("source") == model_fingerprint(pickle_path):
+            return flat
+        print(f"⚠️  {flat_dir} is older than {pickle_path}. Run export_forest.py again.")
+    if ML_RUNTIME == "flat":
+        raise RuntimeError(f"Flattened model not found at {flat_dir}. Run export_forest.py first.")
+
+    if not os.path.exists(pickle_path):
+        raise RuntimeError(f"Model not found at {pickle_path}. Run the training script first.")
+    import joblib
+    return joblib.load(pickle_path)
+
+
+def predict_rows(model, rows: list) -> np.ndarray:
+    if isinstance(model, FlatForest):
+        return model.predict(rows)
+    import pandas as pd
+    return model.predict(pd.DataFrame(rows))
@@ -0,0 +1,111 @@
+import json
+import os
+import threading
+import numpy as np
+from forest_runtime import MMAP_MODE, model_fingerprint
+
+# Get script directory for relative paths
+script_dir = os.path.dirname(os.path.abspath(__file__))
+cube_dir = os.path.join(script_dir, "models", "prediction_cube")
+
+# Set ML_PREDICTION_CUBE=0 to always use the forests
+CUBE_ENABLED = os.getenv("ML_PREDICTION_CUBE", "1") != "0"
+
+# Grid axes after (platform, content_type) and industry, in array order
+NUMERIC_AXES = ["posting_hour", "cta", "influencer", "caption_length"]
+
+TARGETS = {
+    "engagement": "campaign_predictor.pkl",
+    "reach": "reach_predictor.pkl",
+}
+
+
+class PredictionCube:
+    """
+    Precomputed RandomForest outputs over the whole discrete feature grid.
+
+    Numeric features are integer axes clipped to [lo, hi], where the range is
+    taken from the forests' own split thresholds, so every integer input
+    lands in a cell that reproduces the forest prediction exactly (cells are
+    float64, like the forests' own output).
+    """
+
+    def __init__(self, directory: str, mmap_mode=None):
+        with open(os.path.join(directory, "index.json")) as f:
+            self.index = json.load(f)
+
+        self.pair_index = {tuple(pair): i for i, pair in enumerate(self.index["pairs"])}
+        self.industry_index = {name: i for i, name in enumerate(self.index["industries"])}
+        self.numeric_ranges = [tuple(self.index["numeric"][name]) for name in NUMERIC_AXES]
+        self.values = {
+            target: np.load(os.path.join(directory, f"{target}.npy"), mmap_mode=mmap_mode)
+            for target in TARGETS
+        }
+
+    def locate(self, input_data: dict):
+        """Returns the grid cell for an input, or None when it is out of grid"""
+        pair = self.pair_index.get((input_data.get("platform"), input_data.get("content_type")))
+        industry = self.industry_index.get(input_data.get("industry"))
+        if pair is None or industry is None:
+            return None
+
+        cell = [pair, industry]
+        for name, (lo, hi) in zip(NUMERIC_AXES, self.numeric_ranges):
+            value = input_data.get(name)
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            if not isinstance(value, (int, np.integer)):
+                return None
+            cell.append(min(max(int(value), lo), hi) - lo)
+        return tuple(cell)
+
+    def lookup(self, target: str, input_data: dict):
+        cell = self.locate(input_data)
+        if cell is None:
+            return None
+        return float(self.values[target][cell])
+
+    def lookup_many(self, target: str, rows: list):
+        """
+        Returns (values, missing) where missing lists the indices of
+        out-of-grid rows; their slots in values are NaN.
+        """
+        values = np.full(len(rows), np.nan)
+        missing = []
+        for i, row in enumerate(rows):
+            cell = self.locate(row)
+            if cell is None:
+                missing.append(i)
+            else:
+                values[i] = self.values[target][cell]
+        return values, missing
+
+    def is_current(self) -> bool:
+        """False when a model was retrained after the cube was built"""
+        for target, filename in TARGETS.items():
+            path = os.path.join(script_dir, "models", filename)
+            if os.path.exists(path) and model_fingerprint(path) != self.index["models"][target]:
+                return False
+        return True
+
+
+# Load cube (lazy loading)
+cube = None
+_cube_checked = False
+_cube_lock = threading.Lock()
+
+
+def get_cube():
+    """Returns the shared PredictionCube, or None if it is disabled, missing or stale"""
+    global cube, _cube_checked
+    if not _cube_checked:
+        with _cube_lock:
+            if not _cube_checked:
+                if CUBE_ENABLED and os.path.exists(os.path.join(cube_dir, "index.json")):
+                    loaded = PredictionCube(cube_dir, mmap_mode=MMAP_MODE)
+                    if loaded.is_current():
+                        cube = loaded
+                    else:
+                        print("⚠️  Prediction cube is older than the models. Run build_prediction_cube.py again.")
+                _cube_checked = True
+    return cube
@@ -0,0 +1,106 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Collects single prediction requests arriving within a short window and
+    scores them with one batched call.
+
+    predict_batch takes a list of input rows and returns one result per row.
+    A batch is flushed once it holds max_batch items or the oldest item has
+    waited max_wait_ms, whichever comes first.
+    """
+
+    def __init__(self, predict_batch, max_wait_ms: float = 2.0, max_batch: int = 64):
+        self.predict_batch = predict_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch = max_batch
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._max_batch_seen = 0
+        self._batch_sizes = {}
+        self._recent_waits = deque(maxlen=1000)
+
+        self._worker = threading.Thread(target=self._run, name="ml-microbatcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, row: dict) -> Future:
+        future = Future()
+        self._queue.put((row, future, time.perf_counter()))
+        return future
+
+    def predict(self, row: dict, timeout: float = None):
+        return self.submit(row).result(timeout)
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        flush_at = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = flush_at - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    # Window is over, but take whatever is already waiting
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            rows = [row for row, _, _ in batch]
+
+            try:
+                outcomes = self.predict_batch(rows)
+            except Exception:
+                # Score rows one at a time so a bad row only fails its own caller
+                outcomes = []
+                for row in rows:
+                    try:
+                        outcomes.append(self.predict_batch([row])[0])
+                    except Exception as row_error:
+                        outcomes.append(row_error)
+
+            for (_, future, _), outcome in zip(batch, outcomes):
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+
+            self._record(batch, started)
+
+    def _record(self, batch: list, started: float):
+        with self._lock:
+            size = len(batch)
+            self._batches += 1
+            self._items += size
+            self._max_batch_seen = max(self._max_batch_seen, size)
+            self._batch_sizes[size] = self._batch_sizes.get(size, 0) + 1
+            self._recent_waits.extend(started - enqueued for _, _, enqueued in batch)
+
+    def stats(self) -> dict:
+        """Queue depth, batch sizes and queueing delay, for tuning the window"""
+        with self._lock:
+            waits = sorted(self._recent_waits)
+            return {
+                "queue_depth": self._queue.qsize(),
+                "window_ms": self.max_wait * 1000.0,
+                "max_batch": self.max_batch,
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+                "largest_batch": self._max_batch_seen,
+                "batch_size_counts": dict(sorted(self._batch_sizes.items())),
+                "queue_wait_ms_p50": round(waits[len(waits) // 2] * 1000.0, 3) if waits else 0.0,
+                "queue_wait_ms_p99": round(waits[int(len(waits) * 0.99)] * 1000.0, 3) if waits else 0.0,
+            }
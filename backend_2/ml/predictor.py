@@ -1,21 +1,31 @@
-import joblib
-import pandas as pd
 import os
+import threading
+from forest_runtime import load_model, predict_rows
+from prediction_cube import get_cube
+
+try:
+    from metrics import span
+except ImportError:
+    # Metrics live with the API server; standalone scripts run without them
+    from contextlib import nullcontext as span
 
 # Get script directory for relative paths
 script_dir = os.path.dirname(os.path.abspath(__file__))
 model_path = os.path.join(script_dir, "models", "campaign_predictor.pkl")
+flat_model_path = os.path.join(script_dir, "models", "campaign_predictor_flat")
 
 # Load trained model (lazy loading)
 model = None
+_model_lock = threading.Lock()
 
 def get_model():
     global model
     if model is None:
-        if os.path.exists(model_path):
-            model = joblib.load(model_path)
-        else:
-            raise RuntimeError(f"Model not found at {model_path}. Run train_model.py first.")
+        # Concurrent first requests must not load the model twice
+        with _model_lock:
+            if model is None:
+                with span("engagement_model_load"):
+                    model = load_model(model_path, flat_model_path)
     return model
 
 
@@ -32,10 +42,43 @@ def predict_campaign_performance(input_data: dict):
         "influencer": 1
     }
     """
+    cube = get_cube()
+    if cube is not None:
+        with span("engagement_cube_lookup"):
+            engagement = cube.lookup("engagement", input_data)
+        if engagement is not None:
+            return format_prediction(engagement)
+
     m = get_model()
-    df = pd.DataFrame([input_data])
-    engagement = m.predict(df)[0]
+    with span("engagement_forest_predict"):
+        engagement = predict_rows(m, [input_data])[0]
+    return format_prediction(engagement)
+
 
+def predict_campaign_performance_batch(rows: list):
+    """
+    Scores many campaigns with a single model.predict call.
+    Returns one result dict per input row, in order.
+    """
+    cube = get_cube()
+    if cube is None:
+        engagements, missing = [0.0] * len(rows), list(range(len(rows)))
+    else:
+        with span("engagement_cube_lookup"):
+            engagements, missing = cube.lookup_many("engagement", rows)
+
+    # Only out-of-grid rows go through the forest
+    if missing:
+        m = get_model()
+        with span("engagement_forest_predict"):
+            predicted = predict_rows(m, [rows[i] for i in missing])
+        for i, engagement in zip(missing, predicted):
+            engagements[i] = engagement
+
+    return [format_prediction(engagement) for engagement in engagements]
+
+
+def format_prediction(engagement):
     if engagement >= 5:
         label = "High"
     elif engagement >= 3:
@@ -49,7 +92,6 @@ def predict_campaign_performance(input_data: dict):
     }
 
 
-
 # Test run
 if __name__ == "__main__":
     sample_input = {
@@ -1,31 +1,68 @@
-import joblib
-import pandas as pd
 import os
+import threading
+from forest_runtime import load_model, predict_rows
+from prediction_cube import get_cube
+
+try:
+    from metrics import span
+except ImportError:
+    # Metrics live with the API server; standalone scripts run without them
+    from contextlib import nullcontext as span
 
 # Get script directory for relative paths
 script_dir = os.path.dirname(os.path.abspath(__file__))
 model_path = os.path.join(script_dir, "models", "reach_predictor.pkl")
+flat_model_path = os.path.join(script_dir, "models", "reach_predictor_flat")
 
 # Load trained model (lazy loading)
 model = None
+_model_lock = threading.Lock()
 
 def get_model():
     global model
     if model is None:
-        if os.path.exists(model_path):
-            model = joblib.load(model_path)
-        else:
-            raise RuntimeError(f"Model not found at {model_path}. Run train_reach_model.py first.")
+        # Concurrent first requests must not load the model twice
+        with _model_lock:
+            if model is None:
+                with span("reach_model_load"):
+                    model = load_model(model_path, flat_model_path)
     return model
 
 
 def predict_reach(input_data: dict):
+    cube = get_cube()
+    if cube is not None:
+        with span("reach_cube_lookup"):
+            reach = cube.lookup("reach", input_data)
+        if reach is not None:
+            return int(reach)
+
     m = get_model()
-    df = pd.DataFrame([input_data])
-    reach = m.predict(df)[0]
+    with span("reach_forest_predict"):
+        reach = predict_rows(m, [input_data])[0]
     return int(reach)
 
 
+def predict_reach_batch(rows: list):
+    """Predicts reach for many campaigns with a single model.predict call"""
+    cube = get_cube()
+    if cube is None:
+        reaches, missing = [0.0] * len(rows), list(range(len(rows)))
+    else:
+        with span("reach_cube_lookup"):
+            reaches, missing = cube.lookup_many("reach", rows)
+
+    # Only out-of-grid rows go through the forest
+    if missing:
+        m = get_model()
+        with span("reach_forest_predict"):
+            predicted = predict_rows(m, [rows[i] for i in missing])
+        for i, reach in zip(missing, predicted):
+            reaches[i] = reach
+
+    return [int(reach) for reach in reaches]
+
+
 if __name__ == "__main__":
     sample = {
         "platform": "Instagram",
@@ -63,5 +63,6 @@ print(f"Mean Absolute Error: {round(mae, 2)}")
 
 # Save model
 model_path = os.path.join(script_dir, "models", "campaign_predictor.pkl")
+os.makedirs(os.path.dirname(model_path), exist_ok=True)
 joblib.dump(pipeline, model_path)
 print(f"Model saved to {model_path}")
@@ -51,5 +51,6 @@ mae = mean_absolute_error(y_test, preds)
 print(f"Reach MAE: {int(mae)} impressions")
 
 model_path = os.path.join(script_dir, "models", "reach_predictor.pkl")
+os.makedirs(os.path.dirname(model_path), exist_ok=True)
 joblib.dump(pipeline, model_path)
 print(f"Reach model saved to {model_path}")
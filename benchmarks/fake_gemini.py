@@ -0,0 +1,236 @@
+"""
+Local Gemini stand-in for benchmarks
+Serves the generateContent / streamGenerateContent REST API with configurable
+latency, error rate and malformed-JSON rate, answering with Smart Demo
+Generator campaigns so no Gemini quota is used.
+
+Point the API at it with:
+    GOOGLE_API_KEY=fake GEMINI_API_ENDPOINT=http://127.0.0.1:8999 python server.py
+
+Usage:
+    python benchmarks/fake_gemini.py --port 8999 --latency-ms 1500 --error-rate 0.02 --malformed-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import defaultdict, deque
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from smart_demo_generator import generate_smart_campaign
+from backend.prompts import SECTION_FORMATS
+
+MALFORMATIONS = ("fence", "trailing_comma", "prose", "truncate")
+
+config = {
+    "latency_ms": 1500.0,
+    "latency_sigma": 0.3,
+    "error_rate": 0.0,
+    "malformed_rate": 0.0,
+    "stream_chunks": 8,
+    "key_rpm": 0,
+    "seed": None,
+}
+stats = {"calls": 0, "stream_calls": 0, "errors": 0, "malformed": 0, "quota_errors": 0, "calls_by_key": {}}
+key_calls = defaultdict(deque)
+
+app = FastAPI(title="Fake Gemini")
+
+
+def brief_field(prompt: str, name: str, default: str) -> str:
+    match = re.search(rf"^{name}: (.*)$", prompt, re.MULTILINE)
+    return match.group(1).strip() if match else default
+
+
+def campaign_for(prompt: str) -> dict:
+    return generate_smart_campaign(
+        product=brief_field(prompt, "Product", "Product"),
+        audience=brief_field(prompt, "Target Audience", "Everyone"),
+        goal=brief_field(prompt, "Goal", "Awareness"),
+        tone=brief_field(prompt, "Tone", "Professional yet approachable"),
+        budget=brief_field(prompt, "Budget", "$5,000 - $10,000"),
+        duration=brief_field(prompt, "Campaign Duration", "3 Months"),
+        platform=brief_field(prompt, "Platform", "Instagram"),
+        content_type=brief_field(prompt, "Content Type", "Image"),
+        industry=brief_field(prompt, "Industry", "General"),
+    )
+
+
+def answer(prompt: str) -> dict:
+    """The JSON object the real model would be expected to return"""
+    if "JSON TO FIX:" in prompt:
+        structure = prompt.split("REQUIRED STRUCTURE:", 1)[1].split("JSON TO FIX:", 1)[0].strip()
+        section = next((name for name, fmt in SECTION_FORMATS.items() if fmt == structure), None)
+        campaign = campaign_for(prompt)
+        return campaign[section] if section else campaign
+
+    section = re.search(r'Rewrite ONLY the "(\w+)" section', prompt)
+    campaign = campaign_for(prompt)
+    return campaign[section.group(1)] if section else campaign
+
+
+def render(value: dict) -> str:
+    text = json.dumps(value)
+    if random.random() >= config["malformed_rate"]:
+        return text
+
+    stats["malformed"] += 1
+    kind = random.choice(MALFORMATIONS)
+    if kind == "fence":
+        return "```json\n" + text + "\n```"
+    if kind == "trailing_comma":
+        return text[:-1] + ",}"
+    if kind == "prose":
+        return "Here is the campaign:\n" + text + "\nLet me know if you need changes."
+    return text[:int(len(text) * random.uniform(0.5, 0.95))]
+
+
+def response_body(text: str, prompt: str, finished: bool = True) -> dict:
+    body = {
+        "candidates": [{
+            "content": {"parts": [{"text": text}], "role": "model"},
+            "index": 0,
+        }],
+        "usageMetadata": {
+            "promptTokenCount": len(prompt) // 4,
+            "candidatesTokenCount": len(text) // 4,
+            "totalTokenCount": (len(prompt) + len(text)) // 4,
+        },
+    }
+    if finished:
+        body["candidates"][0]["finishReason"] = "STOP"
+    return body
+
+
+def latency_seconds() -> float:
+    return config["latency_ms"] / 1000 * random.lognormvariate(0, config["latency_sigma"])
+
+
+def injected_error():
+    if random.random() < config["error_rate"]:
+        stats["errors"] += 1
+        return JSONResponse(
+            status_code=503,
+            content={"error": {"code": 503, "message": "The model is overloaded.", "status": "UNAVAILABLE"}}
+        )
+    return None
+
+
+def api_key_of(request: Request) -> str:
+    return request.headers.get("x-goog-api-key") or request.query_params.get("key", "")
+
+
+def quota_error(request: Request):
+    """429 once a key has made key_rpm calls in the last minute, like a per-key quota"""
+    key = api_key_of(request)
+    stats["calls_by_key"][key] = stats["calls_by_key"].get(key, 0) + 1
+    if not config["key_rpm"]:
+        return None
+    now = time.monotonic()
+    calls = key_calls[key]
+    while calls and calls[0] <= now - 60:
+        calls.popleft()
+    if len(calls) >= config["key_rpm"]:
+        stats["quota_errors"] += 1
+        return JSONResponse(
+            status_code=429,
+            content={"error": {"code": 429, "message": "Quota exceeded.", "status": "RESOURCE_EXHAUSTED"}}
+        )
+    calls.append(now)
+    return None
+
+
+def prompt_of(payload: dict) -> str:
+    return "".join(
+        part.get("text", "")
+        for content in payload.get("contents", [])
+        for part in content.get("parts", [])
+    )
+
+
+@app.post("/v1beta/models/{model}:generateContent")
+async def generate_content(model: str, request: Request):
+    stats["calls"] += 1
+    error = quota_error(request)
+    if error is not None:
+        return error
+    prompt = prompt_of(await request.json())
+    await asyncio.sleep(latency_seconds())
+    error = injected_error()
+    if error is not None:
+        return error
+    return response_body(render(answer(prompt)), prompt)
+
+
+@app.post("/v1beta/models/{model}:streamGenerateContent")
+async def stream_generate_content(model: str, request: Request):
+    stats["stream_calls"] += 1
+    error = quota_error(request)
+    if error is not None:
+        return error
+    prompt = prompt_of(await request.json())
+    total = latency_seconds()
+    error = injected_error()
+    if error is not None:
+        await asyncio.sleep(total / config["stream_chunks"])
+        return error
+
+    text = render(answer(prompt))
+    size = max(1, len(text) // config["stream_chunks"] + 1)
+    pieces = [text[i:i + size] for i in range(0, len(text), size)]
+
+    async def chunks():
+        yield "["
+        for i, piece in enumerate(pieces):
+            await asyncio.sleep(total / len(pieces))
+            yield ("," if i else "") + json.dumps(response_body(piece, prompt, finished=i == len(pieces) - 1))
+        yield "]"
+
+    return StreamingResponse(chunks(), media_type="application/json")
+
+
+@app.get("/stats")
+def get_stats():
+    return {"config": config, **stats}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--latency-ms", type=float, default=config["latency_ms"], help="median response latency")
+    parser.add_argument("--latency-sigma", type=float, default=config["latency_sigma"], help="lognormal spread of latency")
+    parser.add_argument("--error-rate", type=float, default=config["error_rate"], help="share of calls answered with 503")
+    parser.add_argument("--malformed-rate", type=float, default=config["malformed_rate"], help="share of answers with broken JSON")
+    parser.add_argument("--stream-chunks", type=int, default=config["stream_chunks"])
+    parser.add_argument("--key-rpm", type=int, default=config["key_rpm"], help="per API key calls per minute before 429 (0 = no quota)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    config.update(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate,
+        stream_chunks=args.stream_chunks,
+        key_rpm=args.key_rpm,
+        seed=args.seed,
+    )
+    if args.seed is not None:
+        random.seed(args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+BrandPulse Benchmark
+Starts the fake Gemini server and server:app, drives each endpoint at a fixed
+concurrency and reports latency percentiles, throughput and server RSS.
+Results are saved as JSON (named by timestamp and git commit) so runs can be
+compared across commits.
+
+Usage:
+    python benchmarks/run_benchmark.py --concurrency 16 --requests 200
+    python benchmarks/run_benchmark.py --endpoints generate-campaign --latency-ms 2500 --error-rate 0.05
+    python benchmarks/run_benchmark.py --compare benchmarks/results/<earlier run>.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLATFORMS = ["Instagram", "TikTok", "YouTube", "LinkedIn"]
+INDUSTRIES = ["Fitness", "Tech", "Fashion", "Food", "General"]
+
+USER_CAMPAIGN = {
+    "strategy": {
+        "campaign_theme": "Move Your Way",
+        "target_emotion": "Empowerment",
+        "content_angle": "Everyday athletes",
+    },
+    "visual_identity": {"color_palette": ["#111111", "#FF6B35", "#F5F5F5"], "mood": "Energetic"},
+    "media_plan": {"platforms": ["Instagram", "TikTok"], "posting_schedule": "1 post/day", "cta": "Join now"},
+}
+
+
+def campaign_payload(i: int) -> dict:
+    return {
+        "product": f"Benchmark Product {i}",
+        "audience": "Urban professionals aged 25-35",
+        "goal": "Awareness",
+        "platform": PLATFORMS[i % len(PLATFORMS)],
+        "industry": INDUSTRIES[i % len(INDUSTRIES)],
+        "content_type": "Reel",
+    }
+
+
+ENDPOINTS = {
+    "generate-campaign": ("/api/generate-campaign", campaign_payload),
+    "predict-performance": ("/api/predict-performance", lambda i: {
+        "platform": PLATFORMS[i % len(PLATFORMS)],
+        "content_type": "Reel",
+        "industry": INDUSTRIES[i % len(INDUSTRIES)],
+        "posting_hour": i % 24,
+        "caption_length": 60 + (i * 7) % 200,
+        "cta": i % 2,
+        "influencer": (i // 2) % 2,
+    }),
+    "analyze-competitor": ("/api/analyze-competitor", lambda i: {
+        "industry": "Fitness",
+        "competitor_name": "Nike Training Club",
+        "user_campaign": USER_CAMPAIGN,
+    }),
+    "optimize-budget": ("/api/optimize-budget", lambda i: {
+        "budget": f"${5000 + (i % 10) * 1000:,}",
+        "industry": INDUSTRIES[i % len(INDUSTRIES)],
+        "platform": PLATFORMS[i % len(PLATFORMS)],
+        "goal": "awareness",
+    }),
+    "explain-decision": ("/api/explain-decision", lambda i: {
+        "element_type": ["platform", "content_type", "color_palette", "posting_time"][i % 4],
+        "element_value": "Instagram",
+        "product": f"Benchmark Product {i}",
+        "audience": "Urban professionals",
+    }),
+}
+
+
+def percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def process_tree(pid: int):
+    pids = [pid]
+    for current in pids:
+        try:
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return pids
+
+
+def tree_rss_mb(pid: int) -> float:
+    """Resident memory of a process and its children (uvicorn workers), Linux only"""
+    total_kb = 0
+    for child in process_tree(pid):
+        try:
+            with open(f"/proc/{child}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            pass
+    return round(total_kb / 1024, 1)
+
+
+def git_revision():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, text=True).strip())
+        return commit, dirty
+    except Exception:
+        return "unknown", False
+
+
+def port_in_use(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        return sock.connect_ex(("127.0.0.1", port)) == 0
+
+
+def wait_for(url: str, timeout: float, proc):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Process exited with code {proc.returncode} before {url} was ready")
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise TimeoutError(f"{url} not ready after {timeout}s")
+
+
+async def drive(base_url: str, name: str, requests: int, concurrency: int, server_pid: int) -> dict:
+    path, payload_for = ENDPOINTS[name]
+    latencies, statuses, modes = [], Counter(), Counter()
+    peak_rss = tree_rss_mb(server_pid)
+    next_index = iter(range(requests))
+
+    async def worker(client):
+        for i in next_index:
+            started = time.perf_counter()
+            try:
+                response = await client.post(path, json=payload_for(i))
+                statuses[str(response.status_code)] += 1
+                if response.status_code == 200 and name == "generate-campaign":
+                    meta = response.json().get("_meta", {})
+                    modes[f"gemini:{meta.get('gemini_mode')}"] += 1
+                    modes[f"ml:{meta.get('ml_mode')}"] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async def sample_rss(stop: asyncio.Event):
+        nonlocal peak_rss
+        while not stop.is_set():
+            peak_rss = max(peak_rss, tree_rss_mb(server_pid))
+            await asyncio.sleep(0.2)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_rss(stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await sampler
+
+    errors = sum(count for status, count in statuses.items() if status != "200")
+    return {
+        "path": path,
+        "requests": requests,
+        "concurrency": concurrency,
+        "duration_seconds": round(elapsed, 3),
+        "rps": round(requests / elapsed, 2),
+        "errors": errors,
+        "statuses": dict(statuses),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "mean": round(sum(latencies) / len(latencies), 2),
+            "max": round(max(latencies), 2),
+        },
+        "rss_mb": {"peak": peak_rss, "after": tree_rss_mb(server_pid)},
+        "modes": dict(modes),
+    }
+
+
+def print_results(results: dict):
+    print(f"\n{'endpoint':<22}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'peak RSS':>10}")
+    for name, r in results["endpoints"].items():
+        lat = r["latency_ms"]
+        print(f"{name:<22}{r['rps']:>9}{lat['p50']:>10}{lat['p95']:>10}{lat['p99']:>10}{r['errors']:>8}{r['rss_mb']['peak']:>10}")
+
+
+def print_comparison(results: dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline.get('git_commit')} ({os.path.basename(baseline_path)}):")
+    print(f"{'endpoint':<22}{'rps':>12}{'p50':>12}{'p95':>12}{'p99':>12}")
+
+    def delta(new, old):
+        if not old:
+            return "n/a"
+        return f"{(new - old) / old * 100:+.1f}%"
+
+    for name, r in results["endpoints"].items():
+        old = baseline.get("endpoints", {}).get(name)
+        if old is None:
+            continue
+        print(f"{name:<22}{delta(r['rps'], old['rps']):>12}"
+              + "".join(f"{delta(r['latency_ms'][p], old['latency_ms'][p]):>12}" for p in ("p50", "p95", "p99")))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="comma-separated subset of: " + ", ".join(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for server:app")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--fake-port", type=int, default=8999)
+    parser.add_argument("--latency-ms", type=float, default=1500, help="fake Gemini median latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--cache", action="store_true", help="keep the Gemini response cache enabled")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results"))
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = [name for name in names if name not in ENDPOINTS]
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(unknown)}")
+
+    for port in (args.port, args.fake_port):
+        if port_in_use(port):
+            parser.error(f"port {port} is already in use")
+
+    scratch = tempfile.mkdtemp(prefix="brandpulse-bench-")
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    base_url = f"http://127.0.0.1:{args.port}"
+    env = dict(
+        os.environ,
+        GOOGLE_API_KEY="benchmark",
+        GEMINI_API_ENDPOINT=fake_url,
+        RESPONSE_CACHE_ENABLED="1" if args.cache else "0",
+        RESPONSE_CACHE_PATH=os.path.join(scratch, "responses.sqlite3"),
+        SIMILARITY_CACHE_PATH=os.path.join(scratch, "similarity.sqlite3"),
+        # Saved campaigns go to a scratch SQLite store, never to a real Firestore
+        CAMPAIGN_STORE="sqlite",
+        CAMPAIGN_STORE_PATH=os.path.join(scratch, "campaigns.sqlite3"),
+        FIREBASE_ENABLED="0",
+        PYTHONUNBUFFERED="1",
+    )
+    env.pop("FIRESTORE_EMULATOR_HOST", None)
+
+    log = open(os.path.join(scratch, "server.log"), "w")
+    fake = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "benchmarks", "fake_gemini.py"),
+         "--port", str(args.fake_port),
+         "--latency-ms", str(args.latency_ms),
+         "--latency-sigma", str(args.latency_sigma),
+         "--error-rate", str(args.error_rate),
+         "--malformed-rate", str(args.malformed_rate),
+         "--seed", str(args.seed)],
+        cwd=ROOT, stdout=log, stderr=subprocess.STDOUT
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+
+    try:
+        wait_for(f"{fake_url}/stats", 60, fake)
+        wait_for(f"{base_url}/readyz", 180, server)
+        idle_rss = tree_rss_mb(server.pid)
+
+        commit, dirty = git_revision()
+        results = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": commit,
+            "git_dirty": dirty,
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+            "server_rss_mb_idle": idle_rss,
+            "endpoints": {},
+        }
+        for name in names:
+            print(f"▶ {name}: {args.requests} requests at concurrency {args.concurrency}")
+            results["endpoints"][name] = asyncio.run(
+                drive(base_url, name, args.requests, args.concurrency, server.pid)
+            )
+        results["fake_gemini"] = httpx.get(f"{fake_url}/stats").json()
+    except Exception:
+        print(f"Server log: {log.name}")
+        raise
+    finally:
+        for proc in (server, fake):
+            proc.terminate()
+        for proc in (server, fake):
+            try:
+                proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        log.close()
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{time.strftime('%Y%m%d-%H%M%S')}_{commit}{'-dirty' if dirty else ''}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    shutil.rmtree(scratch, ignore_errors=True)
+
+    print_results(results)
+    if args.compare:
+        print_comparison(results, args.compare)
+    print(f"\n✓ Results saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
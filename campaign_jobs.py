@@ -0,0 +1,142 @@
+"""
+BrandPulse Campaign Jobs
+In-memory background job queue with a bounded worker pool and result retention
+
+Jobs and their results live in the process that accepted them, so polling
+only works against that process: run the API with a single worker
+(WEB_CONCURRENCY=1) when clients use the job endpoints.
+"""
+
+import queue
+import threading
+import time
+import traceback
+import uuid
+from typing import Callable, Dict, Optional
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity"""
+
+
+class JobQueue:
+    """
+    Runs handler(payload) on a fixed pool of worker threads.
+    At most max_queued jobs may wait; finished jobs are kept for result_ttl
+    seconds so clients can poll for them, then dropped.
+    """
+
+    def __init__(self, handler: Callable, workers: int = 2, max_queued: int = 100, result_ttl: float = 3600):
+        self.handler = handler
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._threads = []
+        self._stopping = threading.Event()
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self):
+        if self._threads:
+            return
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"campaign-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stopping.set()
+        # Wakes idle workers; when the queue is full every worker is busy and
+        # sees the flag once its current job finishes, so never block here
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        self._threads = []
+
+    def submit(self, payload) -> Dict:
+        self._purge_expired()
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None
+        }
+
+        with self._lock:
+            try:
+                self._queue.put_nowait((job_id, payload))
+            except queue.Full:
+                self.rejected += 1
+                raise QueueFullError(f"Job queue is full ({self.max_queued} jobs waiting)")
+            self._jobs[job_id] = job
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        self._purge_expired()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def _work(self):
+        while not self._stopping.is_set():
+            item = self._queue.get()
+            if item is None:
+                return
+            job_id, payload = item
+
+            with self._lock:
+                job = self._jobs[job_id]
+                job["status"] = "running"
+                job["started_at"] = time.time()
+
+            try:
+                result, error = self.handler(payload), None
+            except Exception as e:
+                traceback.print_exc()
+                result, error = None, str(e)
+
+            with self._lock:
+                job["status"] = "failed" if error else "succeeded"
+                job["result"] = result
+                job["error"] = error
+                job["finished_at"] = time.time()
+                if error:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["finished_at"] is not None and job["finished_at"] < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job["status"] == "running")
+            return {
+                "workers": self.workers,
+                "queue_depth": self._queue.qsize(),
+                "max_queued": self.max_queued,
+                "running": running,
+                "retained": len(self._jobs),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected
+            }
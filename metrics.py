@@ -0,0 +1,177 @@
+"""
+BrandPulse Metrics
+Dependency-free counters, latency histograms and stage timers,
+rendered in the Prometheus text exposition format at /metrics
+"""
+
+import bisect
+import threading
+import time
+
+# Seconds; spans sub-millisecond cube lookups up to slow Gemini generations
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for values, total in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, values)} {total}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *label_values):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((values, [list(s[0]), s[1], s[2]]) for values, s in self._series.items())
+        for values, (counts, total, count) in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {count}")
+        return lines
+
+
+class Gauge:
+    """Current value read from a callback at scrape time, so owners keep their own state"""
+
+    def __init__(self, name: str, help_text: str, read):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+
+    def render(self):
+        try:
+            value = self.read()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge", f"{self.name} {value}"]
+
+
+class CallbackCounter:
+    """Counters kept by another component, read at scrape time: read() returns {label value: total}"""
+
+    def __init__(self, name: str, help_text: str, label: str, read):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.read = read
+
+    def render(self):
+        try:
+            values = self.read()
+        except Exception:
+            return []
+        if not values:
+            return []
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for value, total in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels((self.label,), (value,))} {total}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "brandpulse_request_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+STAGE_SECONDS = Histogram(
+    "brandpulse_stage_seconds", "Latency of internal stages (Gemini, validation, persistence, ML)", ("stage",)
+)
+FALLBACKS = Counter(
+    "brandpulse_fallbacks_total", "Responses served by a fallback instead of the live backend", ("branch", "reason")
+)
+CACHE_LOOKUPS = Counter(
+    "brandpulse_cache_lookups_total", "Cache lookups by cache and result", ("cache", "result")
+)
+
+REGISTRY = [REQUEST_SECONDS, STAGE_SECONDS, FALLBACKS, CACHE_LOOKUPS]
+
+
+def register(metric):
+    """Add a metric owned by another module to /metrics"""
+    REGISTRY.append(metric)
+    return metric
+
+
+class span:
+    """
+    Times a stage into brandpulse_stage_seconds:
+
+        with span("gemini_generate"):
+            ...
+    """
+
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        STAGE_SECONDS.observe(time.perf_counter() - self.started, self.stage)
+        return False
+
+
+def record_fallback(branch: str, reason: str):
+    FALLBACKS.inc(branch, reason)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_LOOKUPS.inc(cache, "hit" if hit else "miss")
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
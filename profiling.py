@@ -0,0 +1,229 @@
+"""
+BrandPulse Request Profiling
+Wall-clock sampling profiler for individual requests. Profiles are written as
+collapsed stacks (one "frame;frame;frame count" line per stack), which
+flamegraph.pl and speedscope open directly.
+
+Usage:
+    python profiling.py merge [directory] > aggregate.collapsed
+"""
+
+import functools
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+
+# Leaf frames that mean a thread is parked, not working for a request
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+}
+
+
+# The profiler of the request being served, seen by the threads working for it
+_active = ContextVar("active_profiler", default=None)
+
+
+def track_thread():
+    """Count the calling thread as working for the request being profiled, if any"""
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.thread_ids.add(threading.get_ident())
+
+
+def tracked(fn):
+    """fn, registering whichever thread it runs in with the request's profile"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        track_thread()
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def tracked_iter(iterable):
+    """A sync iterator resumed on pool threads; registers each thread it resumes in"""
+    iterator = iter(iterable)
+    while True:
+        track_thread()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        yield item
+
+
+def frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of the threads in thread_ids every interval seconds
+    while running. Threads that pick up work for the request add themselves
+    (see track_thread), so other requests and background workers are left
+    out; idle moments of the tracked threads are skipped.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self.thread_ids = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id not in self.thread_ids:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+
+
+def write_collapsed(samples: Counter, path: str):
+    with open(path, "w") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+class FinishingResponse:
+    """Wraps a response so on_finish runs once it is sent, failed or abandoned mid-stream"""
+
+    def __init__(self, response, on_finish):
+        self.response = response
+        self.on_finish = on_finish
+
+    def __getattr__(self, name):
+        return getattr(self.response, name)
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.response(scope, receive, send)
+        finally:
+            self.on_finish()
+
+
+class RequestProfiler:
+    """
+    Profiles a request when it carries X-Profile and a valid X-Admin-Token,
+    or at random with probability sample_rate. One profile runs at a time;
+    requests arriving meanwhile are served unprofiled.
+    """
+
+    def __init__(self, directory: str, admin_token: str = None, sample_rate: float = 0.0, interval: float = 0.005):
+        self.directory = directory
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self._busy = threading.Lock()
+        self.profiles_written = 0
+
+    def requested(self, headers) -> bool:
+        if not headers.get("x-profile") or not self.admin_token:
+            return False
+        return hmac.compare_digest(headers.get("x-admin-token", ""), self.admin_token)
+
+    async def handle(self, request, call_next):
+        explicit = self.requested(request.headers)
+        if not explicit and not (self.sample_rate > 0 and random.random() < self.sample_rate):
+            return await call_next(request)
+        if not self._busy.acquire(blocking=False):
+            response = await call_next(request)
+            if explicit:
+                response.headers["X-Profile"] = "busy"
+            return response
+
+        request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+        kind = "explicit" if explicit else "sampled"
+        profiler = SamplingProfiler(self.interval)
+        # The event loop thread; call_next copies _active to the tasks and threads below it
+        profiler.thread_ids.add(threading.get_ident())
+        started = time.perf_counter()
+        profiler.start()
+        token = _active.set(profiler)
+        try:
+            response = await call_next(request)
+        except BaseException:
+            self._finish(profiler, request, request_id, kind, started)
+            raise
+        finally:
+            _active.reset(token)
+
+        # The body is produced after call_next returns; stop once it has been sent
+        response.headers["X-Profile-Id"] = request_id
+        return FinishingResponse(response, lambda: self._finish(profiler, request, request_id, kind, started))
+
+    def _finish(self, profiler, request, request_id, kind, started):
+        try:
+            samples = profiler.stop()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            os.makedirs(self.directory, exist_ok=True)
+            route = request.url.path.strip("/").replace("/", "_") or "root"
+            path = os.path.join(self.directory, f"{int(time.time())}_{kind}_{route}_{request_id}.collapsed")
+            write_collapsed(samples, path)
+            self.profiles_written += 1
+            print(f"🔬 Profile of {request.method} {request.url.path} ({elapsed_ms:.0f} ms, "
+                  f"{sum(samples.values())} samples) written to {path}")
+        except Exception as e:
+            print(f"⚠️  Failed to write profile: {e}")
+        finally:
+            self._busy.release()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": bool(self.admin_token) or self.sample_rate > 0,
+            "sample_rate": self.sample_rate,
+            "directory": self.directory,
+            "profiles_written": self.profiles_written
+        }
+
+
+def merge_profiles(directory: str) -> Counter:
+    """Sum every collapsed profile in directory into one aggregate profile"""
+    merged = Counter()
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".collapsed"):
+            continue
+        with open(os.path.join(directory, name)) as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                if stack:
+                    merged[stack] += int(count)
+    return merged
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "merge":
+        print(__doc__)
+        sys.exit(1)
+    default_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "profiles")
+    for stack, count in merge_profiles(sys.argv[2] if len(sys.argv) > 2 else default_dir).most_common():
+        print(f"{stack} {count}")
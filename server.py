@@ -3,12 +3,24 @@ BrandPulse Unified API
 Combines the Strategy Generation (Gemini) with ML Performance Prediction
 """
 
-from fastapi import FastAPI, HTTPException
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.routing import APIRoute
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+import asyncio
+import contextvars
+import functools
+import hmac
+import json
+import math
 import os
 import sys
+import threading
+import time
 
 # Add backend directories to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
@@ -30,47 +42,291 @@ from ai_coach import explain_campaign_decision
 # Import Budget Optimizer
 from budget_optimizer import optimize_budget
 
+# Import Campaign Jobs
+from campaign_jobs import JobQueue, QueueFullError
+
+# Campaign section schemas
+from backend.schemas import SECTION_SCHEMAS
+
+# Adaptive latency threshold for hedged strategy generation
+from backend.resilience import PRIORITY_BACKGROUND, AdmissionRejected, LatencyTracker, call_priority
+
+# Import Metrics
+from metrics import REQUEST_SECONDS, record_fallback, render_metrics, span
+
+# Gemini token and cost accounting
+from backend.usage import current_endpoint, usage_store
+
+# Per-request deadlines
+from backend.deadline import RequestDeadlineExceeded, degraded_stages, has_budget, mark_degraded, remaining, request_deadline
+
+# Import Request Profiling
+from profiling import RequestProfiler, tracked, tracked_iter
+
 
 # Import with graceful error handling
 GEMINI_AVAILABLE = False
+response_cache = None
+campaign_flights = None
+similarity_index = None
+gemini_breaker = None
+gemini_limiter = None
+gemini_pool = None
+campaign_store = None
+json_repair_stats = None
 
 try:
-    from backend.main import run_brandpulse
+    from backend.main import campaign_metadata, regenerate_brandpulse_section, run_brandpulse_with_source, stream_brandpulse
+    from backend.cache import response_cache
+    from backend.orchestrator import campaign_flights
+    from backend.similarity_cache import similarity_index
     from backend.gemini_client import GEMINI_AVAILABLE as _GEMINI_AVAILABLE
+    from backend.gemini_client import breaker as gemini_breaker
+    from backend.gemini_client import limiter as gemini_limiter
+    from backend.gemini_client import pool as gemini_pool
+    from backend import campaign_store
+    from backend.json_repair import repair_stats as json_repair_stats
     GEMINI_AVAILABLE = _GEMINI_AVAILABLE
     print(f"✓ Gemini Backend: {'Available' if GEMINI_AVAILABLE else 'Demo Mode (Smart Generator)'}")
 except Exception as e:
     print(f"⚠️  Gemini Backend not available: {e}")
 
+# Per-branch timeouts for /api/generate-campaign (seconds)
+STRATEGY_TIMEOUT_SECONDS = float(os.environ.get("STRATEGY_TIMEOUT_SECONDS", 45))
+PREDICTION_TIMEOUT_SECONDS = float(os.environ.get("PREDICTION_TIMEOUT_SECONDS", 5))
+
+# Request deadline: X-Request-Timeout (seconds) from the caller or the default, capped at the max
+REQUEST_DEADLINE_SECONDS = float(os.environ.get("REQUEST_DEADLINE_SECONDS", 60))
+REQUEST_DEADLINE_MAX_SECONDS = float(os.environ.get("REQUEST_DEADLINE_MAX_SECONDS", 120))
+# Least time left for a stage to start its expensive path instead of the fallback
+DEADLINE_MIN_GEMINI_SECONDS = float(os.environ.get("DEADLINE_MIN_GEMINI_SECONDS", 3))
+DEADLINE_MIN_PREDICTION_SECONDS = float(os.environ.get("DEADLINE_MIN_PREDICTION_SECONDS", 0.25))
+
+# Hedged strategy generation: once Gemini has taken longer than the given percentile
+# of its recent latencies, the Smart Demo Generator is started in parallel
+HEDGE_ENABLED = os.environ.get("HEDGE_ENABLED", "1") != "0"
+HEDGE_GRACE_SECONDS = float(os.environ.get("HEDGE_GRACE_SECONDS", 1.0))
+gemini_latency = LatencyTracker(
+    percentile=float(os.environ.get("HEDGE_PERCENTILE", 95)),
+    default_seconds=float(os.environ.get("HEDGE_DEFAULT_SECONDS", 10)),
+    min_seconds=float(os.environ.get("HEDGE_MIN_SECONDS", 3)),
+    max_seconds=float(os.environ.get("HEDGE_MAX_SECONDS", 30)),
+    min_samples=int(os.environ.get("HEDGE_MIN_SAMPLES", 20))
+)
+
+# Token sent as X-Admin-Token for profiling and admin endpoints; unset disables them
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN") or None
+
+# Request profiling: X-Profile with a matching X-Admin-Token, or a random PROFILE_SAMPLE_RATE share of requests
+request_profiler = RequestProfiler(
+    directory=os.environ.get("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "profiles")),
+    admin_token=ADMIN_TOKEN,
+    sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", 0)),
+    interval=float(os.environ.get("PROFILE_INTERVAL_MS", 5)) / 1000
+)
+
+# Runs the prediction branch alongside campaign, streamed and background generations
+PREDICTION_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("PREDICTION_THREADS", 16)), thread_name_prefix="prediction-branch"
+)
+# Blocking Gemini strategy branches. Calls that time out or lose a hedge keep their
+# thread until Gemini answers, so this is sized well past the Gemini concurrency limit
+STRATEGY_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("STRATEGY_THREADS", 64)), thread_name_prefix="strategy-branch"
+)
+# Smart Demo hedges and fallbacks; separate so stuck Gemini threads can't delay them
+FALLBACK_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="fallback-branch")
+
+# Background campaign jobs
+CAMPAIGN_JOB_WORKERS = int(os.environ.get("CAMPAIGN_JOB_WORKERS", 2))
+CAMPAIGN_JOB_QUEUE_MAX = int(os.environ.get("CAMPAIGN_JOB_QUEUE_MAX", 100))
+CAMPAIGN_JOB_RESULT_TTL_SECONDS = float(os.environ.get("CAMPAIGN_JOB_RESULT_TTL_SECONDS", 3600))
+
+# Upper bound on rows per /api/predict-performance/batch call
+MAX_PREDICTION_BATCH = int(os.environ.get("MAX_PREDICTION_BATCH", 1000))
+
+# Micro-batching of concurrent single-row predictions
+ML_MICROBATCH = os.environ.get("ML_MICROBATCH", "1") != "0"
+ML_BATCH_WINDOW_MS = float(os.environ.get("ML_BATCH_WINDOW_MS", 2))
+ML_BATCH_MAX_SIZE = int(os.environ.get("ML_BATCH_MAX_SIZE", 64))
+
+# Train/export missing models in the warmup thread rather than before the port binds
+ML_BUILD_ARTIFACTS = os.environ.get("ML_BUILD_ARTIFACTS", "1") != "0"
+# Set while the warmup thread may still be writing model files; predictions stay smart until then
+ML_ARTIFACTS_PENDING = threading.Event()
+
 # Lazy load ML modules
 ML_MODULES = {}
+ML_MODULES_LOCK = threading.Lock()
 
 def get_ml_modules():
     """Lazy load ML modules on first use"""
     global ML_MODULES
+    if ML_ARTIFACTS_PENDING.is_set():
+        return {'available': False}
     if not ML_MODULES:
-        try:
-            from predictor import predict_campaign_performance
-            from reach_predictor import predict_reach
-            from recommendation_engine import generate_recommendations
-            ML_MODULES = {
-                'predict_campaign_performance': predict_campaign_performance,
-                'predict_reach': predict_reach,
-                'generate_recommendations': generate_recommendations,
-                'available': True
-            }
-            print("✓ ML Prediction Backend: Available")
-        except Exception as e:
-            print(f"⚠️  ML Backend not available: {e}")
-            ML_MODULES = {'available': False}
+        with ML_MODULES_LOCK:
+            if not ML_MODULES:
+                ML_MODULES = load_ml_modules()
     return ML_MODULES
 
 
+def load_ml_modules() -> dict:
+    try:
+        from predictor import predict_campaign_performance, predict_campaign_performance_batch
+        from predictor import get_model as get_engagement_model
+        from reach_predictor import predict_reach, predict_reach_batch
+        from reach_predictor import get_model as get_reach_model
+        from prediction_cube import get_cube
+        from recommendation_engine import generate_recommendations
+        modules = {
+            'predict_campaign_performance': predict_campaign_performance,
+            'predict_campaign_performance_batch': predict_campaign_performance_batch,
+            'predict_reach': predict_reach,
+            'predict_reach_batch': predict_reach_batch,
+            'generate_recommendations': generate_recommendations,
+            'available': True
+        }
+
+        def load_models():
+            get_engagement_model()
+            get_reach_model()
+            get_cube()
+        modules['load_models'] = load_models
+
+        def predict_ml_batch(rows):
+            return list(zip(predict_campaign_performance_batch(rows), predict_reach_batch(rows)))
+        modules['predict_ml_batch'] = predict_ml_batch
+        if ML_MICROBATCH:
+            from prediction_service import MicroBatcher
+            modules['prediction_service'] = MicroBatcher(
+                predict_ml_batch,
+                max_wait_ms=ML_BATCH_WINDOW_MS,
+                max_batch=ML_BATCH_MAX_SIZE
+            )
+        print("✓ ML Prediction Backend: Available")
+        return modules
+    except Exception as e:
+        print(f"⚠️  ML Backend not available: {e}")
+        return {'available': False}
+
+
+# ============ WARMUP ============
+
+# One row served from the prediction cube, one that forces a forest traversal
+WARMUP_ROWS = [
+    {"platform": "Instagram", "content_type": "Reel", "industry": "Fitness",
+     "posting_hour": 18, "caption_length": 120, "cta": 1, "influencer": 0},
+    {"platform": "TikTok", "content_type": "Video", "industry": "General",
+     "posting_hour": 18, "caption_length": 120, "cta": 1, "influencer": 0},
+]
+
+READINESS = {
+    "ready": False,
+    "build_seconds": None,
+    "ml_load_seconds": None,
+    "warmup_seconds": None,
+    "error": None
+}
+
+
+def warm_up():
+    """Build any missing artifacts, then load both pipelines and page them in with a dummy prediction"""
+    started = time.perf_counter()
+    try:
+        if ML_BUILD_ARTIFACTS:
+            try:
+                from build_artifacts import build_artifacts
+                build_artifacts()
+                READINESS["build_seconds"] = round(time.perf_counter() - started, 3)
+            finally:
+                ML_ARTIFACTS_PENDING.clear()
+        loading = time.perf_counter()
+        ml = get_ml_modules()
+        if ml.get('available', False):
+            ml['load_models']()
+            READINESS["ml_load_seconds"] = round(time.perf_counter() - loading, 3)
+            ml['predict_ml_batch'](WARMUP_ROWS)
+    except Exception as e:
+        # Serve smart predictions rather than failing every request on a missing model
+        print(f"⚠️  ML warmup failed, using smart predictions: {e}")
+        ML_MODULES['available'] = False
+        READINESS["error"] = str(e)
+
+    READINESS["warmup_seconds"] = round(time.perf_counter() - started, 3)
+    READINESS["memory"] = memory_report()
+    READINESS["ready"] = True
+    print(f"✓ Warmup complete in {READINESS['warmup_seconds']}s")
+    print_memory_report(READINESS["memory"])
+
+
+def memory_report() -> dict:
+    """This worker's RSS split into shared and private pages (Linux /proc)"""
+    fields = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    except OSError:
+        return {"pid": os.getpid(), "available": False}
+
+    return {
+        "pid": os.getpid(),
+        "available": True,
+        "ml_mmap": os.environ.get("ML_MMAP", "0") == "1",
+        "rss_mb": round(fields.get("Rss", 0), 1),
+        "pss_mb": round(fields.get("Pss", 0), 1),
+        "shared_mb": round(fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0), 1),
+        "private_mb": round(fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0), 1)
+    }
+
+
+def print_memory_report(report: dict):
+    if not report.get("available"):
+        return
+    print(
+        f"📊 Worker {report['pid']}: RSS {report['rss_mb']} MB "
+        f"(shared {report['shared_mb']} MB, private {report['private_mb']} MB, "
+        f"proportional {report['pss_mb']} MB, models {'memory-mapped' if report['ml_mmap'] else 'in-process'})"
+    )
+
+
+def prepare_shared_models():
+    """Every worker maps the same read-only arrays exported by build_artifacts()"""
+    os.environ["ML_MMAP"] = "1"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so /healthz answers while models build and load
+    if ML_BUILD_ARTIFACTS:
+        ML_ARTIFACTS_PENDING.set()
+    threading.Thread(target=warm_up, name="model-warmup", daemon=True).start()
+    campaign_job_queue.start()
+    yield
+    campaign_job_queue.stop()
+    if campaign_store is not None:
+        campaign_store.stop()
+
+
+class TrackedRoute(APIRoute):
+    """Sync endpoints run on threadpool threads; a request profile samples the one serving it"""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not asyncio.iscoroutinefunction(endpoint):
+            endpoint = tracked(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
 app = FastAPI(
     title="BrandPulse Unified API",
     description="AI-Powered Brand Campaign Strategist with Performance Prediction",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
+app.router.route_class = TrackedRoute
 
 # CORS Configuration for frontend
 app.add_middleware(
@@ -82,6 +338,51 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Per-route latency histogram. Streaming responses are timed until their headers are sent."""
+    started = time.perf_counter()
+    status = 500
+    # Gemini token usage is attributed to the endpoint that caused it
+    endpoint = current_endpoint.set(request.url.path)
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        current_endpoint.reset(endpoint)
+        route = request.scope.get("route")
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            request.method,
+            route.path if route is not None else "unmatched",
+            str(status)
+        )
+
+
+def deadline_seconds(request: Request) -> float:
+    try:
+        seconds = float(request.headers.get("x-request-timeout", REQUEST_DEADLINE_SECONDS))
+    except ValueError:
+        seconds = REQUEST_DEADLINE_SECONDS
+    if not math.isfinite(seconds):
+        seconds = REQUEST_DEADLINE_SECONDS
+    return min(max(seconds, 0.0), REQUEST_DEADLINE_MAX_SECONDS)
+
+
+@app.middleware("http")
+async def apply_request_deadline(request: Request, call_next):
+    """Every stage of the request, including its worker threads, sees the time left"""
+    with request_deadline(deadline_seconds(request)):
+        return await call_next(request)
+
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """Opt-in sampling profiles written as collapsed stacks to PROFILE_DIR"""
+    return await request_profiler.handle(request, call_next)
+
+
 # ============ REQUEST SCHEMAS ============
 
 class UnifiedCampaignRequest(BaseModel):
@@ -101,6 +402,9 @@ class UnifiedCampaignRequest(BaseModel):
     caption_length: Optional[int] = 120
     cta: Optional[int] = 1
     influencer: Optional[int] = 0
+    
+    # Set to False to skip the cached Gemini generation for an identical brief
+    use_cache: Optional[bool] = True
 
 
 class PerformancePredictionRequest(BaseModel):
@@ -113,6 +417,17 @@ class PerformancePredictionRequest(BaseModel):
     influencer: int = 0
 
 
+class BatchPredictionRequest(BaseModel):
+    items: List[PerformancePredictionRequest]
+
+
+class RegenerateSectionRequest(UnifiedCampaignRequest):
+    # Campaign previously generated from this brief, and the section to redo
+    campaign: Dict[str, Any]
+    section: str
+    feedback: Optional[str] = None
+
+
 class CompetitorAnalysisRequest(BaseModel):
     industry: str
     competitor_name: Optional[str] = None
@@ -277,111 +592,324 @@ def generate_smart_recommendations(platform: str, content_type: str, industry: s
 
 @app.get("/")
 def health_check():
-    ml = get_ml_modules()
     return {
         "status": "BrandPulse Unified API Running",
         "version": "2.0.0",
         "gemini_available": GEMINI_AVAILABLE,
-        "ml_available": ml.get('available', False),
+        "ml_available": ML_MODULES.get('available', False),
+        "ready": READINESS["ready"],
+        "response_cache": response_cache.stats() if response_cache is not None else None,
+        "single_flight": campaign_flights.stats() if campaign_flights is not None else None,
+        "similarity_cache": similarity_index.stats() if similarity_index is not None else None,
+        "gemini_circuit": gemini_breaker.stats() if gemini_breaker is not None else None,
+        "gemini_limiter": gemini_limiter.stats() if gemini_limiter is not None else None,
+        "gemini_pool": gemini_pool.stats() if gemini_pool is not None else None,
+        "campaign_jobs": campaign_job_queue.stats(),
+        "campaign_store": campaign_store.stats() if campaign_store is not None else None,
+        "json_repair": json_repair_stats.stats() if json_repair_stats is not None else None,
+        "profiling": request_profiler.stats(),
+        "hedging": {"enabled": HEDGE_ENABLED, "grace_seconds": HEDGE_GRACE_SECONDS, **gemini_latency.stats()},
         "smart_demo": True,
         "mode": "live" if GEMINI_AVAILABLE else "smart-demo"
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus metrics: request and stage latency histograms, fallback and cache counters"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def require_admin(request: Request):
+    token = request.headers.get("x-admin-token", "")
+    if not ADMIN_TOKEN or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="A valid X-Admin-Token header is required")
+
+
+@app.get("/api/admin/usage")
+def get_gemini_usage(
+    request: Request,
+    group_by: Optional[str] = Query(None, description="Comma separated: endpoint, operation, industry, platform, model")
+):
+    """
+    Gemini token, cost and latency totals since startup, broken down by
+    endpoint, operation, industry, platform and model (or just group_by).
+    """
+    require_admin(request)
+    try:
+        if group_by:
+            return usage_store.summary([name.strip() for name in group_by.split(",") if name.strip()])
+        return usage_store.summary()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/healthz")
+def liveness():
+    """Liveness probe: the process is up and serving. Never touches the models."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readiness():
+    """Readiness probe: 503 until the warmup has loaded and exercised the models"""
+    status_code = 200 if READINESS["ready"] else 503
+    return JSONResponse(status_code=status_code, content={
+        **READINESS,
+        "ml_available": ML_MODULES.get('available', False)
+    })
+
+
+def campaign_input_for(request: UnifiedCampaignRequest) -> dict:
+    """The brief fields the Gemini backend works from"""
+    return {
+        "product": request.product,
+        "audience": request.audience,
+        "goal": request.goal,
+        "tone": request.tone,
+        "budget": request.budget,
+        "campaign_duration": request.campaign_duration,
+        "platform": request.platform,
+        "content_type": request.content_type,
+        "industry": request.industry
+    }
+
+
+def generate_strategy(request: UnifiedCampaignRequest, answered: "HedgeOutcome" = None):
+    """Strategy branch: Gemini when available, Smart Demo Generator otherwise.
+    Returns (campaign, mode). Real Gemini latencies feed the hedging threshold,
+    including calls that finish after the hedge has already answered; under a
+    hedge (answered) the campaign is saved only if this branch answered."""
+    if GEMINI_AVAILABLE and has_budget("strategy", DEADLINE_MIN_GEMINI_SECONDS):
+        # Try to use real Gemini API
+        try:
+            started = time.perf_counter()
+            campaign_result, source = run_brandpulse_with_source(
+                campaign_input_for(request),
+                use_cache=request.use_cache is not False,
+                save=False
+            )
+            # Cache, similar and coalesced hits say nothing about Gemini's latency, and were saved already
+            if source == "gemini":
+                gemini_latency.record(time.perf_counter() - started)
+                if answered is None or answered.claim("live"):
+                    campaign_store.save_campaign(campaign_result, campaign_metadata(campaign_input_for(request)))
+            print("✓ Used Gemini API successfully")
+            return campaign_result, "live"
+        except Exception as gemini_error:
+            print(f"⚠️  Gemini API failed: {gemini_error}")
+            print("🧠 Falling back to Smart Demo Generator")
+            record_fallback("gemini", gemini_fallback_reason(gemini_error))
+            if remaining() <= 0:
+                mark_degraded("strategy")
+
+    if answered is None or answered.claim("live"):
+        return demo_strategy(request), "smart-demo"
+    return generate_demo_strategy(request), "smart-demo"
+
+
+def gemini_fallback_reason(error: Exception) -> str:
+    """Fallback metric reason: "shed" when admission control turned the call away,
+    "deadline" when the request ran out of time"""
+    if isinstance(error, AdmissionRejected):
+        return "shed"
+    return "deadline" if isinstance(error, RequestDeadlineExceeded) else "error"
+
+
+def generate_demo_strategy(request: UnifiedCampaignRequest) -> dict:
+    """Smart Demo Generator campaign for a request"""
+    return generate_smart_campaign(
+        product=request.product,
+        audience=request.audience,
+        goal=request.goal,
+        tone=request.tone,
+        budget=request.budget,
+        duration=request.campaign_duration,
+        platform=request.platform,
+        content_type=request.content_type,
+        industry=request.industry
+    )
+
+
+def save_demo_campaign(request: UnifiedCampaignRequest, campaign: dict):
+    """Store a Smart Demo campaign the way generate_strategy stores Gemini ones"""
+    if campaign_store is not None:
+        # The endpoints add prediction and _meta to the campaign they return
+        campaign_store.save_campaign(dict(campaign), campaign_metadata(campaign_input_for(request)))
+
+
+def demo_strategy(request: UnifiedCampaignRequest) -> dict:
+    """Smart Demo campaign served as the whole strategy of a request, saved like a Gemini one"""
+    campaign = generate_demo_strategy(request)
+    save_demo_campaign(request, campaign)
+    return campaign
+
+
+def generate_prediction(request: UnifiedCampaignRequest):
+    """Prediction branch: ML models when available, smart prediction otherwise.
+    Returns (prediction, mode)."""
+    ml = get_ml_modules()
+    if ml.get('available', False) and has_budget("prediction", DEADLINE_MIN_PREDICTION_SECONDS):
+        try:
+            ml_input = {
+                "platform": request.platform,
+                "content_type": request.content_type,
+                "industry": request.industry,
+                "posting_hour": request.posting_hour,
+                "caption_length": request.caption_length,
+                "cta": request.cta,
+                "influencer": request.influencer
+            }
+            
+            engagement_result, reach = predict_single(ml, ml_input)
+            return build_ml_prediction(ml, ml_input, engagement_result, reach), "live"
+        except Exception as ml_error:
+            print(f"ML Prediction error: {ml_error}")
+            record_fallback("ml", "error")
+            if remaining() <= 0:
+                mark_degraded("prediction")
+
+    return generate_demo_prediction(request), "smart-demo"
+
+
+def predict_single(ml: dict, ml_input: dict):
+    """Engagement and reach for one row, through the micro-batcher when enabled"""
+    service = ml.get('prediction_service')
+    if service is not None:
+        return service.predict(ml_input, timeout=min(PREDICTION_TIMEOUT_SECONDS, remaining()))
+    return ml['predict_ml_batch']([ml_input])[0]
+
+
+def build_ml_prediction(ml: dict, ml_input: dict, engagement_result: dict, reach: int) -> dict:
+    """Shape raw model outputs into the performance prediction response"""
+    with span("recommendations"):
+        recommendations = ml['generate_recommendations'](
+            ml_input,
+            engagement_result["predicted_engagement_rate"],
+            reach
+        )
+    
+    return {
+        "predicted_reach": int(reach),
+        "engagement_rate": f"{engagement_result['predicted_engagement_rate']:.2f}%",
+        "effectiveness": engagement_result["effectiveness"],
+        "best_posting_time": get_best_posting_time(ml_input["platform"]),
+        "recommendations": recommendations
+    }
+
+
+def generate_demo_prediction(request: UnifiedCampaignRequest) -> dict:
+    """Smart prediction for a request"""
+    return get_smart_prediction(
+        request.platform, 
+        request.content_type, 
+        request.industry,
+        request.influencer == 1
+    )
+
+
+def run_in(executor, fn, *args):
+    """Awaitable fn(*args) on executor, carrying the request's contextvars (deadline, profile)"""
+    call = functools.partial(contextvars.copy_context().run, tracked(fn), *args)
+    return asyncio.get_running_loop().run_in_executor(executor, call)
+
+
+async def run_branch(branch, fallback, request, timeout: float, label: str, metric_branch: str, executor):
+    """Run a blocking branch on executor, falling back if it exceeds its timeout
+    or the request deadline. The abandoned thread is left to finish on its own."""
+    left = max(remaining(), 0.0)
+    try:
+        return await asyncio.wait_for(run_in(executor, branch, request), min(timeout, left))
+    except asyncio.TimeoutError:
+        print(f"⚠️  {label} branch timed out after {min(timeout, left):.1f}s, using Smart Demo fallback")
+        record_fallback(metric_branch, "timeout")
+        if left < timeout:
+            mark_degraded(label.lower())
+        return fallback(request), "smart-demo"
+
+
+class HedgeOutcome:
+    """Which branch of a hedged request answered it. The first to claim saves its
+    campaign; the other one's is dropped so a request stores one campaign."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.branch = None
+
+    def claim(self, branch: str) -> bool:
+        with self._lock:
+            if self.branch is None:
+                self.branch = branch
+            return self.branch == branch
+
+
+async def hedged_strategy(request: UnifiedCampaignRequest):
+    """
+    Strategy branch with hedging. Returns ((campaign, mode), hedged).
+    If Gemini has not answered within the adaptive threshold, the Smart Demo
+    Generator runs in parallel; once it is ready Gemini still gets
+    HEDGE_GRACE_SECONDS to finish before the demo campaign is used.
+    """
+    threshold = min(gemini_latency.threshold(), STRATEGY_TIMEOUT_SECONDS)
+    # Hedge early enough that the demo campaign still lands inside the request deadline
+    deadline_bound = max(remaining() - HEDGE_GRACE_SECONDS, 0.0)
+    hedge_for_deadline = deadline_bound < threshold
+    if hedge_for_deadline:
+        threshold = deadline_bound
+    answered = HedgeOutcome()
+    live = asyncio.ensure_future(run_in(STRATEGY_EXECUTOR, generate_strategy, request, answered))
+    done, _ = await asyncio.wait({live}, timeout=threshold)
+    if live in done:
+        return live.result(), False
+
+    print(f"⏱️  Gemini slower than {threshold:.1f}s, hedging with Smart Demo Generator")
+    demo = asyncio.ensure_future(run_in(FALLBACK_EXECUTOR, generate_demo_strategy, request))
+    done, _ = await asyncio.wait({live, demo}, return_when=asyncio.FIRST_COMPLETED)
+    if live in done:
+        return live.result(), True
+
+    done, _ = await asyncio.wait({live}, timeout=HEDGE_GRACE_SECONDS)
+    if live in done or not answered.claim("demo"):
+        # Gemini claimed the answer as the grace period ran out
+        return await live, True
+    record_fallback("gemini", "hedged")
+    if hedge_for_deadline:
+        mark_degraded("strategy")
+    await run_in(FALLBACK_EXECUTOR, save_demo_campaign, request, demo.result())
+    return (demo.result(), "smart-demo"), True
+
+
+async def strategy_branch(request: UnifiedCampaignRequest):
+    """Strategy branch for /api/generate-campaign. Returns ((campaign, mode), hedged)."""
+    if HEDGE_ENABLED and GEMINI_AVAILABLE:
+        return await hedged_strategy(request)
+    result = await run_branch(generate_strategy, demo_strategy, request,
+                              STRATEGY_TIMEOUT_SECONDS, "Strategy", "gemini", STRATEGY_EXECUTOR)
+    return result, False
+
+
 @app.post("/api/generate-campaign")
-def generate_full_campaign(request: UnifiedCampaignRequest):
+async def generate_full_campaign(request: UnifiedCampaignRequest):
     """
     Main endpoint: Generates complete campaign strategy using Gemini AI
     and predicts performance using ML models.
+    Strategy generation and performance prediction run concurrently.
     """
     try:
-        # Step 1: Generate Campaign Strategy
-        campaign_result = None
-        
-        if GEMINI_AVAILABLE:
-            # Try to use real Gemini API
-            try:
-                campaign_input = {
-                    "product": request.product,
-                    "audience": request.audience,
-                    "goal": request.goal,
-                    "tone": request.tone,
-                    "budget": request.budget,
-                    "campaign_duration": request.campaign_duration,
-                    "platform": request.platform,
-                    "content_type": request.content_type
-                }
-                campaign_result = run_brandpulse(campaign_input)
-                print("✓ Used Gemini API successfully")
-            except Exception as gemini_error:
-                print(f"⚠️  Gemini API failed: {gemini_error}")
-                print("🧠 Falling back to Smart Demo Generator")
-                campaign_result = None
-        
-        # Use SMART demo generator if Gemini failed or unavailable
-        if campaign_result is None:
-            campaign_result = generate_smart_campaign(
-                product=request.product,
-                audience=request.audience,
-                goal=request.goal,
-                tone=request.tone,
-                budget=request.budget,
-                duration=request.campaign_duration,
-                platform=request.platform,
-                content_type=request.content_type,
-                industry=request.industry
-            )
+        ((campaign_result, gemini_mode), hedged), (prediction, ml_mode) = await asyncio.gather(
+            strategy_branch(request),
+            run_branch(generate_prediction, generate_demo_prediction, request,
+                       PREDICTION_TIMEOUT_SECONDS, "Prediction", "ml", PREDICTION_EXECUTOR)
+        )
         
-        # Step 2: Add Performance Prediction
-        ml = get_ml_modules()
-        if ml.get('available', False):
-            try:
-                ml_input = {
-                    "platform": request.platform,
-                    "content_type": request.content_type,
-                    "industry": request.industry,
-                    "posting_hour": request.posting_hour,
-                    "caption_length": request.caption_length,
-                    "cta": request.cta,
-                    "influencer": request.influencer
-                }
-                
-                engagement_result = ml['predict_campaign_performance'](ml_input)
-                reach = ml['predict_reach'](ml_input)
-                recommendations = ml['generate_recommendations'](
-                    ml_input,
-                    engagement_result["predicted_engagement_rate"],
-                    reach
-                )
-                
-                campaign_result["performance_prediction"] = {
-                    "predicted_reach": int(reach),
-                    "engagement_rate": f"{engagement_result['predicted_engagement_rate']:.2f}%",
-                    "effectiveness": engagement_result["effectiveness"],
-                    "best_posting_time": get_best_posting_time(request.platform),
-                    "recommendations": recommendations
-                }
-            except Exception as ml_error:
-                print(f"ML Prediction error: {ml_error}")
-                campaign_result["performance_prediction"] = get_smart_prediction(
-                    request.platform, 
-                    request.content_type, 
-                    request.industry,
-                    request.influencer == 1
-                )
-        else:
-            # Use smart prediction
-            campaign_result["performance_prediction"] = get_smart_prediction(
-                request.platform, 
-                request.content_type, 
-                request.industry,
-                request.influencer == 1
-            )
+        campaign_result["performance_prediction"] = prediction
         
         # Add metadata
         campaign_result["_meta"] = {
-            "gemini_mode": "live" if GEMINI_AVAILABLE else "smart-demo",
-            "ml_mode": "live" if ml.get('available', False) else "smart-demo"
+            "gemini_mode": gemini_mode,
+            "ml_mode": ml_mode,
+            "hedged": hedged,
+            "degraded": degraded_stages()
         }
         
         return campaign_result
@@ -392,6 +920,209 @@ def generate_full_campaign(request: UnifiedCampaignRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def build_campaign(request: UnifiedCampaignRequest) -> dict:
+    """Blocking counterpart of /api/generate-campaign for background jobs"""
+    prediction_future = PREDICTION_EXECUTOR.submit(generate_prediction, request)
+    # Jobs queue behind interactive requests for Gemini slots
+    endpoint = current_endpoint.set("/api/campaign-jobs")
+    try:
+        with call_priority(PRIORITY_BACKGROUND):
+            campaign_result, gemini_mode = generate_strategy(request)
+    finally:
+        current_endpoint.reset(endpoint)
+    try:
+        prediction, ml_mode = prediction_future.result(timeout=PREDICTION_TIMEOUT_SECONDS)
+    except Exception as ml_error:
+        print(f"⚠️  Prediction failed in job: {ml_error}")
+        record_fallback("ml", "error")
+        prediction, ml_mode = generate_demo_prediction(request), "smart-demo"
+
+    campaign_result["performance_prediction"] = prediction
+    campaign_result["_meta"] = {
+        "gemini_mode": gemini_mode,
+        "ml_mode": ml_mode
+    }
+    return campaign_result
+
+
+# Jobs are tracked per process, so the job endpoints need WEB_CONCURRENCY=1
+campaign_job_queue = JobQueue(
+    build_campaign,
+    workers=CAMPAIGN_JOB_WORKERS,
+    max_queued=CAMPAIGN_JOB_QUEUE_MAX,
+    result_ttl=CAMPAIGN_JOB_RESULT_TTL_SECONDS
+)
+
+
+@app.post("/api/campaign-jobs", status_code=202)
+def submit_campaign_job(request: UnifiedCampaignRequest):
+    """
+    Queue a campaign generation and return immediately with a job id to poll.
+    """
+    try:
+        job = campaign_job_queue.submit(request)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "status_url": f"/api/campaign-jobs/{job['job_id']}"
+    }
+
+
+@app.get("/api/campaign-jobs/{job_id}")
+def get_campaign_job(job_id: str):
+    """
+    Status of a queued campaign generation, with the campaign once it has succeeded.
+    """
+    job = campaign_job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or its result has expired")
+    return job
+
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def campaign_event_stream(request: UnifiedCampaignRequest):
+    """
+    Server-sent events for /api/generate-campaign/stream: one "section" event per
+    top-level campaign section as soon as it validates, then "performance_prediction",
+    then "done" with the _meta block.
+    """
+    # Executor threads don't inherit contextvars; carry the request deadline over
+    prediction_future = PREDICTION_EXECUTOR.submit(contextvars.copy_context().run, tracked(generate_prediction), request)
+    emitted = {}
+    gemini_mode = "smart-demo"
+
+    if GEMINI_AVAILABLE and has_budget("strategy", DEADLINE_MIN_GEMINI_SECONDS):
+        try:
+            for name, section in stream_brandpulse(
+                campaign_input_for(request),
+                use_cache=request.use_cache is not False
+            ):
+                emitted[name] = section
+                yield sse_event("section", {"name": name, "data": section})
+            gemini_mode = "live"
+        except Exception as gemini_error:
+            print(f"⚠️  Gemini stream failed: {gemini_error}")
+            print("🧠 Filling remaining sections from Smart Demo Generator")
+            record_fallback("gemini", gemini_fallback_reason(gemini_error))
+            gemini_mode = "partial" if emitted else "smart-demo"
+            if remaining() <= 0:
+                mark_degraded("strategy")
+
+    if gemini_mode != "live":
+        demo = generate_demo_strategy(request)
+        for name, section in demo.items():
+            if name not in emitted:
+                yield sse_event("section", {"name": name, "data": section})
+        save_demo_campaign(request, {**demo, **emitted})
+
+    try:
+        prediction, ml_mode = prediction_future.result(timeout=min(PREDICTION_TIMEOUT_SECONDS, max(remaining(), 0.0)))
+    except Exception as ml_error:
+        print(f"⚠️  Prediction failed in stream: {ml_error}")
+        record_fallback("ml", "error")
+        if remaining() <= 0:
+            mark_degraded("prediction")
+        prediction, ml_mode = generate_demo_prediction(request), "smart-demo"
+    yield sse_event("performance_prediction", prediction)
+
+    yield sse_event("done", {"_meta": {"gemini_mode": gemini_mode, "ml_mode": ml_mode, "degraded": degraded_stages()}})
+
+
+@app.post("/api/generate-campaign/stream")
+def generate_campaign_stream(request: UnifiedCampaignRequest):
+    """
+    Streaming variant of /api/generate-campaign using server-sent events.
+    Sections are sent as Gemini produces them instead of after the whole campaign.
+    """
+    return StreamingResponse(
+        tracked_iter(campaign_event_stream(request)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/api/regenerate-section")
+def regenerate_campaign_section(request: RegenerateSectionRequest):
+    """
+    Regenerate a single section (e.g. copywriting, campaign_timeline) of an
+    existing campaign, using the rest of the campaign as context.
+    """
+    if request.section not in SECTION_SCHEMAS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown section '{request.section}'. Expected one of: {', '.join(SECTION_SCHEMAS)}"
+        )
+
+    if GEMINI_AVAILABLE and has_budget("strategy", DEADLINE_MIN_GEMINI_SECONDS):
+        try:
+            section = regenerate_brandpulse_section(
+                campaign_input_for(request),
+                request.campaign,
+                request.section,
+                request.feedback
+            )
+            return {"section": request.section, "data": section,
+                    "_meta": {"gemini_mode": "live", "degraded": degraded_stages()}}
+        except Exception as gemini_error:
+            print(f"⚠️  Section regeneration failed: {gemini_error}")
+            print("🧠 Falling back to Smart Demo Generator")
+            record_fallback("gemini", gemini_fallback_reason(gemini_error))
+            if remaining() <= 0:
+                mark_degraded("strategy")
+
+    section = generate_demo_strategy(request)[request.section]
+    return {"section": request.section, "data": section,
+            "_meta": {"gemini_mode": "smart-demo", "degraded": degraded_stages()}}
+
+
+def get_store():
+    store = campaign_store.campaign_store if campaign_store is not None else None
+    if store is None:
+        raise HTTPException(status_code=503, detail="Campaign store is not enabled")
+    return store
+
+
+@app.get("/api/campaigns")
+def list_campaigns(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    industry: Optional[str] = None,
+    platform: Optional[str] = None,
+    goal: Optional[str] = None,
+    include_campaign: bool = False
+):
+    """
+    Saved campaigns, newest first. Pass next_cursor from a response as cursor
+    to fetch the following page.
+    """
+    try:
+        items, next_cursor = get_store().list_campaigns(
+            limit=limit,
+            cursor=cursor,
+            include_campaign=include_campaign,
+            industry=industry,
+            platform=platform,
+            goal=goal
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"campaigns": items, "next_cursor": next_cursor}
+
+
+@app.get("/api/campaigns/{campaign_id}")
+def get_campaign(campaign_id: int):
+    """A saved campaign with its full generated content"""
+    campaign = get_store().get(campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return campaign
+
+
 @app.post("/api/predict-performance")
 def predict_performance_only(request: PerformancePredictionRequest):
     """
@@ -410,26 +1141,80 @@ def predict_performance_only(request: PerformancePredictionRequest):
     try:
         ml_input = request.dict()
         
-        engagement_result = ml['predict_campaign_performance'](ml_input)
-        reach = ml['predict_reach'](ml_input)
-        recommendations = ml['generate_recommendations'](
-            ml_input,
-            engagement_result["predicted_engagement_rate"],
-            reach
-        )
-        
-        return {
-            "predicted_reach": int(reach),
-            "engagement_rate": f"{engagement_result['predicted_engagement_rate']:.2f}%",
-            "effectiveness": engagement_result["effectiveness"],
-            "best_posting_time": get_best_posting_time(request.platform),
-            "recommendations": recommendations
-        }
+        engagement_result, reach = predict_single(ml, ml_input)
+        return build_ml_prediction(ml, ml_input, engagement_result, reach)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/predict-performance/batch")
+def predict_performance_batch(request: BatchPredictionRequest):
+    """
+    Batch endpoint: Scores many campaign variants with one model.predict call per model.
+    Each row gets its own result, so one bad row does not fail the batch.
+    """
+    if len(request.items) > MAX_PREDICTION_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large: {len(request.items)} items (max {MAX_PREDICTION_BATCH})"
+        )
+    
+    ml_inputs = [item.dict() for item in request.items]
+    ml = get_ml_modules()
+    
+    if not ml.get('available', False):
+        results = [
+            {"index": i, "status": "ok", "prediction": get_smart_prediction(
+                row["platform"], row["content_type"], row["industry"], row["influencer"] == 1
+            )}
+            for i, row in enumerate(ml_inputs)
+        ]
+        return {"count": len(results), "errors": 0, "ml_mode": "smart-demo", "results": results}
+    
+    try:
+        engagement_results = ml['predict_campaign_performance_batch'](ml_inputs)
+        reaches = ml['predict_reach_batch'](ml_inputs)
+        scored = list(zip(engagement_results, reaches))
+    except Exception as batch_error:
+        # Isolate the failing rows by scoring them one at a time
+        print(f"⚠️  Batch prediction failed, scoring rows individually: {batch_error}")
+        scored = []
+        for row in ml_inputs:
+            try:
+                scored.append((ml['predict_campaign_performance'](row), ml['predict_reach'](row)))
+            except Exception as row_error:
+                scored.append(row_error)
+    
+    results = []
+    for i, (row, outcome) in enumerate(zip(ml_inputs, scored)):
+        try:
+            if isinstance(outcome, Exception):
+                raise outcome
+            engagement_result, reach = outcome
+            results.append({
+                "index": i,
+                "status": "ok",
+                "prediction": build_ml_prediction(ml, row, engagement_result, reach)
+            })
+        except Exception as e:
+            results.append({"index": i, "status": "error", "error": str(e)})
+    
+    errors = sum(1 for r in results if r["status"] == "error")
+    return {"count": len(results), "errors": errors, "ml_mode": "live", "results": results}
+
+
+@app.get("/api/ml/batch-stats")
+def ml_batch_stats():
+    """
+    Micro-batcher metrics: queue depth, batch sizes and queueing delay.
+    """
+    service = get_ml_modules().get('prediction_service')
+    if service is None:
+        return {"enabled": False}
+    return {"enabled": True, **service.stats()}
+
+
 @app.post("/api/get-competitors")
 def get_competitors(request: CompetitorAnalysisRequest):
     """
@@ -515,16 +1300,23 @@ def get_optimized_budget(request: BudgetOptimizerRequest):
 
 if __name__ == "__main__":
     import uvicorn
-    ml = get_ml_modules()
+    workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+    if workers > 1:
+        prepare_shared_models()
+        print("⚠️  Campaign jobs are tracked per worker; polling /api/campaign-jobs needs WEB_CONCURRENCY=1")
     print("\n" + "="*60)
     print("🚀 BrandPulse API Server Starting...")
     print("="*60)
     print(f"   Gemini:  {'✓ Live Mode' if GEMINI_AVAILABLE else '🧠 Smart Demo Mode'}")
-    print(f"   ML:      {'✓ Live Mode' if ml.get('available', False) else '🧠 Smart Demo Mode'}")
+    print("   ML:      ⏳ Loading in the background (see /readyz)")
     print("="*60)
+    print(f"   Workers: {workers}{' (shared memory-mapped models)' if workers > 1 else ''}")
     print("   API Docs: http://localhost:8000/docs")
     print("   Frontend: http://localhost:5173")
     print("="*60 + "\n")
     
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run("server:app", host="0.0.0.0", port=port, reload=False if os.environ.get("PORT") else True)
+    if workers > 1:
+        uvicorn.run("server:app", host="0.0.0.0", port=port, workers=workers)
+    else:
+        uvicorn.run("server:app", host="0.0.0.0", port=port, reload=False if os.environ.get("PORT") else True)
@@ -0,0 +1,13 @@
+import os
+import sys
+
+# Same import roots as server.py: the repo itself and the ML scripts directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ML_DIR = os.path.join(ROOT, "backend_2", "ml")
+for path in (ROOT, ML_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Keep the module-level caches and stores out of the checkout; tests build their own
+os.environ.setdefault("RESPONSE_CACHE_ENABLED", "0")
+os.environ.setdefault("FIREBASE_ENABLED", "0")
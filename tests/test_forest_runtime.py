@@ -0,0 +1,119 @@
+import itertools
+import os
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from export_forest import export_pipeline
+from forest_runtime import FlatForest, load_model, model_fingerprint, predict_rows
+
+ML_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend_2", "ml")
+DATA_PATH = os.path.join(ML_DIR, "..", "data", "campaign_performance_data.csv")
+CATEGORICAL = ["platform", "content_type", "industry"]
+NUMERIC = ["posting_hour", "caption_length", "cta", "influencer"]
+
+
+@pytest.fixture(scope="module")
+def data():
+    return pd.read_csv(DATA_PATH).sample(3000, random_state=0)
+
+
+@pytest.fixture(scope="module")
+def pipeline(data):
+    """Same layout as train_model.py, with a smaller forest"""
+    pipeline = Pipeline(steps=[
+        ("preprocessor", ColumnTransformer(transformers=[
+            ("cat", OneHotEncoder(handle_unknown="ignore"), CATEGORICAL),
+            ("num", "passthrough", NUMERIC),
+        ])),
+        ("model", RandomForestRegressor(n_estimators=20, max_depth=10, random_state=42)),
+    ])
+    return pipeline.fit(data.drop(["reach", "engagement"], axis=1), data["engagement"])
+
+
+@pytest.fixture(scope="module")
+def exported(pipeline, tmp_path_factory):
+    """(pickle path, flat dir) with the export fingerprinted against the pickle"""
+    directory = tmp_path_factory.mktemp("model")
+    pickle_path = str(directory / "model.pkl")
+    flat_dir = str(directory / "model_flat")
+    joblib.dump(pipeline, pickle_path)
+    export_pipeline(pipeline, flat_dir, source=model_fingerprint(pickle_path))
+    return pickle_path, flat_dir
+
+
+def grid_rows(data):
+    platforms = sorted(data["platform"].unique())[:3]
+    industries = sorted(data["industry"].unique())[:3]
+    rows = []
+    for platform, industry, hour, length, cta, influencer in itertools.product(
+        platforms, industries, (0, 9, 20, 23), (0, 80, 300), (0, 1), (0, 1)
+    ):
+        content_type = data.loc[data["platform"] == platform, "content_type"].iloc[0]
+        rows.append({
+            "platform": platform, "content_type": content_type, "industry": industry,
+            "posting_hour": hour, "caption_length": length, "cta": cta, "influencer": influencer,
+        })
+    return rows
+
+
+def test_flat_forest_matches_pipeline_on_grid_rows(pipeline, exported, data):
+    rows = grid_rows(data)
+    flat = FlatForest(exported[1])
+    expected = pipeline.predict(pd.DataFrame(rows))
+    np.testing.assert_allclose(flat.predict(rows), expected, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(predict_rows(flat, rows), expected, rtol=0, atol=1e-9)
+
+
+def test_flat_forest_matches_pipeline_on_unseen_categories(pipeline, exported, data):
+    rows = [
+        dict(row, platform="Snapchat") if i % 3 == 0 else
+        dict(row, content_type="Hologram") if i % 3 == 1 else
+        dict(row, industry="Aerospace", platform="MySpace")
+        for i, row in enumerate(grid_rows(data)[:60])
+    ]
+    expected = pipeline.predict(pd.DataFrame(rows))
+    np.testing.assert_allclose(FlatForest(exported[1]).predict(rows), expected, rtol=0, atol=1e-9)
+
+
+def test_predict_rows_matches_pipeline_on_training_rows(pipeline, exported, data):
+    rows = data.drop(["reach", "engagement"], axis=1).head(500)
+    flat = load_model(*exported)
+    assert isinstance(flat, FlatForest)
+    np.testing.assert_allclose(
+        predict_rows(flat, rows.to_dict("records")), pipeline.predict(rows), rtol=0, atol=1e-9
+    )
+
+
+def test_stale_export_falls_back_to_pipeline(pipeline, exported, tmp_path):
+    pickle_path = str(tmp_path / "retrained.pkl")
+    joblib.dump(pipeline, pickle_path)
+    with open(pickle_path, "ab") as f:
+        f.write(b"\0")  # Different content, so the export's fingerprint no longer matches
+    assert not isinstance(load_model(pickle_path, exported[1]), FlatForest)
+
+
+def test_load_model_does_not_import_sklearn_or_pandas(exported):
+    check = (
+        "import sys\n"
+        "from forest_runtime import FlatForest, load_model, predict_rows\n"
+        f"model = load_model({exported[0]!r}, {exported[1]!r})\n"
+        "assert isinstance(model, FlatForest), type(model)\n"
+        "predict_rows(model, [{'platform': 'TikTok', 'content_type': 'Reel', 'industry': 'Fitness',"
+        " 'posting_hour': 20, 'caption_length': 120, 'cta': 1, 'influencer': 1}])\n"
+        "print(sorted({'sklearn', 'pandas'} & set(sys.modules)))\n"
+    )
+    env = dict(os.environ, ML_RUNTIME="auto")
+    result = subprocess.run(
+        [sys.executable, "-c", check], cwd=ML_DIR, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,113 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+from backend import gemini_client
+from backend.gemini_pool import GeminiPool, PoolExhausted, make_gemini_model
+from backend.resilience import AdaptiveLimiter, CircuitBreaker, RetryBudget
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Calls each fake key may make per minute before the fake answers 429
+KEY_RPM = 2
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def fake_gemini():
+    """benchmarks/fake_gemini.py on a free port with a per-key quota; yields its base URL"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "benchmarks/fake_gemini.py", "--port", str(port),
+         "--latency-ms", "5", "--latency-sigma", "0.01", "--key-rpm", str(KEY_RPM)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f"{url}/stats", timeout=1).read()
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            pytest.skip("fake Gemini did not start")
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def calls_by_key(url: str) -> dict:
+    with urllib.request.urlopen(f"{url}/stats", timeout=5) as response:
+        return json.loads(response.read())["calls_by_key"]
+
+
+@pytest.fixture
+def gemini(fake_gemini, monkeypatch):
+    """Points gemini_client at the fake with fresh resilience state; returns a pool factory"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    monkeypatch.setattr(gemini_client, "GEMINI_AVAILABLE", True)
+    monkeypatch.setattr(gemini_client, "GEMINI_RETRY_BASE_DELAY", 0.01)
+    monkeypatch.setattr(gemini_client, "breaker", breaker)
+    monkeypatch.setattr(gemini_client, "retry_budget", RetryBudget(0.2))
+    monkeypatch.setattr(gemini_client, "limiter", AdaptiveLimiter(8, 1, 32, max_queue=8))
+
+    def use_pool(keys, requests_per_minute=0):
+        pool = GeminiPool(
+            keys, ["gemini-2.5-flash"],
+            lambda key, model_name: make_gemini_model(key, model_name, fake_gemini),
+            requests_per_minute=requests_per_minute, drain_seconds=60
+        )
+        monkeypatch.setattr(gemini_client, "pool", pool)
+        return pool
+
+    return use_pool
+
+
+def test_calls_rotate_across_keys(gemini, fake_gemini):
+    gemini(["rotate-a", "rotate-b"], requests_per_minute=KEY_RPM)
+    for _ in range(4):
+        assert gemini_client.gemini_generate("Product: Trail shoes")
+
+    counts = calls_by_key(fake_gemini)
+    assert counts["rotate-a"] == 2 and counts["rotate-b"] == 2
+
+
+def test_key_is_drained_after_a_429_and_the_call_moves_on(gemini, fake_gemini):
+    # No local quota estimate, so the pool keeps picking the first key until the fake says 429
+    pool = gemini(["drain-a", "drain-b"])
+    for _ in range(KEY_RPM + 1):
+        assert gemini_client.gemini_generate("Product: Trail shoes")
+
+    first, second = pool.stats()["slots"]
+    assert first["quota_errors"] == 1 and first["drained_for_seconds"] > 0
+    assert second["quota_errors"] == 0 and second["calls"] == 1
+    counts = calls_by_key(fake_gemini)
+    assert counts["drain-a"] == KEY_RPM + 1 and counts["drain-b"] == 1
+
+
+def test_exhausted_pool_does_not_trip_the_breaker(gemini):
+    pool = gemini(["exhaust-a"])
+    for _ in range(KEY_RPM):
+        gemini_client.gemini_generate("Product: Trail shoes")
+
+    for _ in range(3):
+        with pytest.raises(PoolExhausted):
+            gemini_client.gemini_generate("Product: Trail shoes")
+
+    assert not pool.available()
+    # A threshold of one failure would have opened it on the first exhausted call
+    assert gemini_client.breaker.stats()["state"] == CircuitBreaker.CLOSED
+    assert gemini_client.limiter.stats()["in_flight"] == 0
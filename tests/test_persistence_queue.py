@@ -0,0 +1,104 @@
+import threading
+import time
+
+from backend.persistence_queue import WriteBehindQueue
+
+
+class FakeWriter:
+    """In-memory writer that records every batch it is handed"""
+
+    def __init__(self, failures: int = 0):
+        self.batches = []
+        self.failures = failures
+        self.written = threading.Event()
+
+    def __call__(self, docs):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("write failed")
+        self.batches.append((time.monotonic(), list(docs)))
+        self.written.set()
+
+
+def test_single_document_is_flushed_after_the_interval():
+    writer = FakeWriter()
+    queue = WriteBehindQueue(writer, batch_size=50, flush_interval=0.1)
+    queue.start()
+    time.sleep(0.05)  # Let the writer go idle, as it is between requests
+    try:
+        queued_at = time.monotonic()
+        assert queue.put({"n": 1})
+        assert writer.written.wait(2.0), "a lone document was never flushed"
+        written_at, docs = writer.batches[0]
+        assert docs == [{"n": 1}]
+        assert 0.08 <= written_at - queued_at < 1.0
+    finally:
+        queue.stop()
+
+
+def test_full_batch_is_flushed_without_waiting_for_the_interval():
+    writer = FakeWriter()
+    queue = WriteBehindQueue(writer, batch_size=3, flush_interval=30.0)
+    queue.start()
+    try:
+        for n in range(3):
+            queue.put({"n": n})
+        assert writer.written.wait(2.0)
+        assert writer.batches[0][1] == [{"n": 0}, {"n": 1}, {"n": 2}]
+    finally:
+        queue.stop()
+
+
+def test_failed_batch_is_retried_then_written():
+    writer = FakeWriter(failures=1)
+    queue = WriteBehindQueue(writer, batch_size=50, flush_interval=0.05, retry_base_delay=0.01)
+    queue.start()
+    try:
+        queue.put({"n": 1})
+        assert queue.flush(timeout=2.0)
+        assert [docs for _, docs in writer.batches] == [[{"n": 1}]]
+        stats = queue.stats()
+        assert stats["failed_flushes"] == 1 and stats["written"] == 1
+    finally:
+        queue.stop()
+
+
+def test_stop_flushes_what_is_still_queued():
+    writer = FakeWriter()
+    queue = WriteBehindQueue(writer, batch_size=50, flush_interval=30.0)
+    queue.start()
+    queue.put({"n": 1})
+    queue.put({"n": 2})
+    queue.stop()
+    assert [doc for _, docs in writer.batches for doc in docs] == [{"n": 1}, {"n": 2}]
+
+
+def test_put_drops_documents_past_max_queued():
+    queue = WriteBehindQueue(FakeWriter(), max_queued=1)
+    assert queue.put({"n": 1})
+    assert not queue.put({"n": 2})
+    assert queue.stats()["dropped"] == 1
+
+
+def test_saved_campaign_is_a_snapshot(monkeypatch):
+    from backend import campaign_store, firebase_service
+
+    local_writer, firestore_writer = FakeWriter(), FakeWriter()
+    local = WriteBehindQueue(local_writer, flush_interval=30.0)
+    firestore = WriteBehindQueue(firestore_writer, flush_interval=30.0)
+    monkeypatch.setattr(campaign_store, "store_queue", local)
+    monkeypatch.setattr(firebase_service, "persistence_queue", firestore)
+
+    campaign = {"campaign_name": "Run", "strategy": {"channels": ["Instagram"]}}
+    campaign_store.save_campaign(campaign, {"product": "Nike running shoes"})
+    # What server.py does to the returned campaign after it is saved
+    campaign["performance_prediction"] = {"engagement_rate": "4.2%"}
+    campaign["strategy"]["channels"].append("TikTok")
+
+    for queue in (local, firestore):
+        queue.start()
+        queue.stop()
+    saved = local_writer.batches[0][1][0]["campaign"]
+    assert saved == {"campaign_name": "Run", "strategy": {"channels": ["Instagram"]}}
+    doc = firestore_writer.batches[0][1][0]
+    assert "performance_prediction" not in doc and doc["strategy"]["channels"] == ["Instagram"]
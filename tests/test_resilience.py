@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+
+from backend.resilience import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, AdaptiveLimiter, AdmissionRejected
+
+
+def far() -> float:
+    return time.monotonic() + 10
+
+
+def acquire_on_thread(limiter: AdaptiveLimiter, order: list, name: str, priority: int) -> threading.Thread:
+    def wait():
+        limiter.acquire(far(), priority)
+        order.append(name)
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    return thread
+
+
+def wait_for_queue(limiter: AdaptiveLimiter, depth: int):
+    for _ in range(200):
+        if limiter.stats()["queue_depth"] == depth:
+            return
+        time.sleep(0.005)
+    raise AssertionError(f"queue never reached {depth}")
+
+
+def test_calls_over_the_limit_queue_and_are_granted_by_priority():
+    limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_limit=4, max_queue=4)
+    limiter.acquire(far())
+    order = []
+    background = acquire_on_thread(limiter, order, "background", PRIORITY_BACKGROUND)
+    wait_for_queue(limiter, 1)
+    interactive = acquire_on_thread(limiter, order, "interactive", PRIORITY_INTERACTIVE)
+    wait_for_queue(limiter, 2)
+
+    limiter.release()
+    interactive.join(2.0)
+    limiter.release()
+    background.join(2.0)
+    assert order == ["interactive", "background"]
+    assert limiter.stats()["queued"] == 2
+
+
+def test_full_queue_sheds():
+    limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_limit=4, max_queue=0)
+    limiter.acquire(far())
+    with pytest.raises(AdmissionRejected):
+        limiter.acquire(far())
+    assert limiter.stats()["shed_queue_full"] == 1
+
+
+def test_call_that_cannot_finish_before_its_deadline_is_shed_up_front():
+    limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_limit=1, max_queue=4)
+    limiter.acquire(far())
+    limiter.release(latency=2.0)
+    limiter.acquire(far())
+    started = time.monotonic()
+    with pytest.raises(AdmissionRejected):
+        limiter.acquire(time.monotonic() + 1.0)
+    assert time.monotonic() - started < 0.5
+    assert limiter.stats()["shed_deadline"] == 1
+
+
+def test_limit_grows_on_success_and_halves_on_overload():
+    limiter = AdaptiveLimiter(initial_limit=4, min_limit=1, max_limit=16, max_queue=4)
+    for _ in range(4):
+        limiter.acquire(far())
+        limiter.release(latency=0.1)
+    assert limiter.limit > 4
+
+    grown = limiter.limit
+    limiter.acquire(far())
+    limiter.release(overloaded=True)
+    assert limiter.limit == pytest.approx(grown / 2)
+    assert limiter.stats()["overloads"] == 1 and limiter.stats()["in_flight"] == 0
@@ -0,0 +1,33 @@
+from backend import orchestrator
+from backend.cache import ResponseCache, cache_key
+from backend.similarity_cache import SimilarityIndex
+
+
+def brief(product: str, audience: str = "Marathon runners aged 25-40") -> str:
+    return f"""
+Product: {product}
+Target Audience: {audience}
+Goal: Drive online sales
+Tone: Energetic and motivational
+Platform: Instagram
+Content Type: Reel
+"""
+
+
+def test_similar_hit_is_one_response_cache_lookup(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), ttl_seconds=60, max_entries=100)
+    index = SimilarityIndex(str(tmp_path / "similarity.sqlite3"), threshold=0.7, max_entries=100)
+    monkeypatch.setattr(orchestrator, "response_cache", cache)
+    monkeypatch.setattr(orchestrator, "similarity_index", index)
+
+    original = brief("Nike running shoes")
+    cache.set(cache_key(original), {"campaign_name": "Run"})
+    index.add(cache_key(original), original)
+
+    campaign, source = orchestrator.generate_campaign_with_source(
+        brief("nike Running-Shoes", audience="Marathon runners aged 25 to 40")
+    )
+    assert source == "similar" and campaign["campaign_name"] == "Run"
+    # The exact lookup missed; fetching the similar brief's entry is counted by the index
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert (index.hits, index.misses) == (1, 0)
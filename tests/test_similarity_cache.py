@@ -0,0 +1,62 @@
+import pytest
+
+from backend.similarity_cache import SimilarityIndex, partition_of, brief_fields
+
+
+def brief(product: str, audience: str = "Marathon runners aged 25-40", goal: str = "Drive online sales",
+          tone: str = "Energetic and motivational", platform: str = "Instagram") -> str:
+    return f"""
+Product: {product}
+Target Audience: {audience}
+Goal: {goal}
+Tone: {tone}
+Budget: $5,000 - $10,000
+Campaign Duration: 3 Months
+Platform: {platform}
+Content Type: Reel
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    return SimilarityIndex(str(tmp_path / "similarity.sqlite3"), threshold=0.7, max_entries=100)
+
+
+def test_another_brands_product_is_never_matched(index):
+    index.add("nike", brief("Nike running shoes"))
+    assert index.find(brief("Adidas running shoes")) is None
+
+
+def test_near_duplicate_brief_for_the_same_product_is_matched(index):
+    index.add("nike", brief("Nike running shoes"))
+    match = index.find(brief("nike Running-Shoes", audience="Marathon runners aged 25 to 40"))
+    assert match is not None
+    key, similarity = match
+    assert key == "nike" and similarity >= 0.7
+
+
+def test_different_platform_is_never_matched(index):
+    index.add("nike", brief("Nike running shoes"))
+    assert index.find(brief("Nike running shoes", platform="TikTok")) is None
+
+
+def test_product_word_order_and_case_share_a_partition():
+    assert partition_of(brief_fields(brief("Nike Running Shoes"))) == \
+        partition_of(brief_fields(brief("running shoes, nike")))
+
+
+def test_find_does_not_count_until_the_caller_reports(index):
+    index.add("nike", brief("Nike running shoes"))
+    assert index.find(brief("Nike running shoes")) is not None
+    assert index.stats()["hits"] == 0 and index.stats()["misses"] == 0
+
+    index.record_miss()  # e.g. the response cache entry had expired
+    index.record_hit("nike")
+    stats = index.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_index_survives_a_restart(index, tmp_path):
+    index.add("nike", brief("Nike running shoes"))
+    reopened = SimilarityIndex(index.path, threshold=0.7, max_entries=100)
+    assert reopened.find(brief("Nike running shoes"))[0] == "nike"
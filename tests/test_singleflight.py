@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from backend.deadline import RequestDeadlineExceeded, request_deadline
+from backend.singleflight import SingleFlight
+
+
+def start_leader(flight: SingleFlight, fn) -> dict:
+    """Runs fn as the leader of key "k" on a thread; returns where its outcome lands"""
+    outcome = {}
+
+    def lead():
+        try:
+            outcome["result"] = flight.run("k", fn)
+        except Exception as e:
+            outcome["error"] = e
+
+    outcome["thread"] = threading.Thread(target=lead)
+    outcome["thread"].start()
+    return outcome
+
+
+def test_concurrent_callers_share_one_execution_and_get_their_own_copy():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = start_leader(flight, lambda: (release.wait(2.0), {"tags": ["a"]})[1])
+    time.sleep(0.05)
+
+    threading.Timer(0.05, release.set).start()
+    result, is_leader = flight.run("k", lambda: pytest.fail("a follower must not execute"))
+    leader["thread"].join()
+
+    assert not is_leader and leader["result"][1]
+    assert result == leader["result"][0] and result is not leader["result"][0]
+    assert flight.stats() == {"in_flight": 0, "executions": 1, "coalesced": 1}
+
+
+def test_follower_gives_up_at_its_own_deadline():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = start_leader(flight, lambda: release.wait(2.0))
+    time.sleep(0.05)
+    try:
+        started = time.monotonic()
+        with request_deadline(0.1), pytest.raises(RequestDeadlineExceeded):
+            flight.run("k", lambda: None)
+        assert time.monotonic() - started < 1.0
+    finally:
+        release.set()
+        leader["thread"].join()
+    assert "error" not in leader
+
+
+def test_follower_runs_the_call_itself_when_the_leader_ran_out_of_time():
+    flight = SingleFlight()
+    follower_waiting = threading.Event()
+
+    def short_deadline_leader():
+        follower_waiting.wait(2.0)
+        time.sleep(0.05)
+        raise RequestDeadlineExceeded("leader's request deadline passed")
+
+    leader = start_leader(flight, short_deadline_leader)
+    time.sleep(0.05)
+    follower_waiting.set()
+    result, is_leader = flight.run("k", lambda: {"campaign": "ok"})
+    leader["thread"].join()
+
+    assert isinstance(leader["error"], RequestDeadlineExceeded)
+    assert result == {"campaign": "ok"} and is_leader
+    assert flight.stats()["executions"] == 2
+
+
+def test_other_leader_errors_are_shared():
+    flight = SingleFlight()
+    follower_waiting = threading.Event()
+
+    def failing_leader():
+        follower_waiting.wait(2.0)
+        time.sleep(0.05)
+        raise ValueError("Gemini returned invalid JSON")
+
+    leader = start_leader(flight, failing_leader)
+    time.sleep(0.05)
+    follower_waiting.set()
+    with pytest.raises(ValueError):
+        flight.run("k", lambda: pytest.fail("a follower must not execute"))
+    leader["thread"].join()
@@ -0,0 +1,22 @@
+from backend.usage import summarize
+
+
+def row(**values):
+    base = {
+        "calls": 0, "estimated_calls": 0, "cache_hits": 0,
+        "prompt_tokens": 0, "response_tokens": 0, "template_tokens": 0,
+        "latency_seconds": 0.0, "cost_usd": 0.0
+    }
+    return {**base, **values}
+
+
+def test_cache_only_group_reports_no_latency():
+    totals = summarize([row(cache_hits=3)])
+    assert "avg_latency_seconds" not in totals
+    assert totals["cache_hit_rate"] == 1.0
+
+
+def test_latency_is_averaged_over_gemini_calls():
+    totals = summarize([row(calls=2, latency_seconds=3.0), row(cache_hits=2)])
+    assert totals["avg_latency_seconds"] == 1.5
+    assert totals["cache_hit_rate"] == 0.5